@@ -1,16 +1,39 @@
 import streamlit as st
-import yfinance as yf
 import pandas as pd
 import warnings
-import requests
 import os
-import base64
 from io import StringIO
 from datetime import datetime
+from scanner import iter_scan
+from rules import build_rule
+from price_store import PriceStore
+from fundamentals import FundamentalsFetcher, FundamentalsTable
+from refresher import SnapshotRefresher
+from universe import UniverseService
+from render import get_link, movers_html, strong_buy_html, fund_cards_html, results_table, small_multiples
+from assets import mascot_src, LogoCache
+from markets import DOMAINS
+from live import LiveWatchlist, TickReplay, poll_quotes
+from profiling import StageTimer
+from shared_cache import SharedCache
 
 # --- KONFIGURACJA ---
 st.set_page_config(page_title="KOLgejt", page_icon="🐊", layout="wide")
 warnings.simplefilter(action='ignore', category=FutureWarning)
+SCAN_CHUNK_SIZE = 100  # ile tickerów w jednym zapytaniu yf.download
+SCAN_RETRIES = 2
+DATA_DIR = os.environ.get("KOLGEJT_DATA", "data")
+FUND_WORKERS = 8      # równoległe zapytania o fundamenty
+FUND_RATE = 8.0       # maks. zapytań .info na sekundę
+FUND_TIMEOUT = 15     # sekundy na jedno zapytanie
+REFRESH_INTERVAL = 600  # co ile sekund wątek w tle odświeża snapshoty rynków
+RESULTS_PAGE = 20      # trafień skanera na stronę w widoku listy
+LIVE_POLL = 60         # co ile sekund watchlista pyta Yahoo o bieżące ceny
+LIVE_REPLAY = 2        # co ile sekund kolejna porcja ticków z pliku
+LIVE_REPLAY_BATCH = 5  # ticków na spółkę w jednej porcji
+LIVE_MAX = 20          # maks. spółek na watchliście
+LIVE_ALERTS = 50       # ile ostatnich alertów pokazujemy
+CACHE_MAX_MB = 256     # limit wspólnego cache (SQLite w DATA_DIR, dzielony przez procesy)
 
 # --- CSS ---
 st.markdown("""
@@ -86,177 +109,85 @@ div.stButton > button:first-child { font-weight: bold; border-radius: 8px; }
 </style>
 """, unsafe_allow_html=True)
 
-# --- LISTY ---
-POOL_SP500 = ["NVDA", "META", "AMD", "AMZN", "MSFT", "GOOGL", "AAPL", "TSLA", "NFLX", "AVGO", "LLY", "JPM", "V", "MA", "COST", "PEP", "KO", "XOM", "CVX", "BRK-B", "DIS", "WMT", "HD", "PG", "MRK", "ABBV", "CRM", "ACN", "LIN", "ADBE"]
-POOL_NASDAQ = ["NVDA", "META", "AMD", "AMZN", "MSFT", "GOOGL", "AAPL", "TSLA", "NFLX", "AVGO", "COST", "PEP", "INTC", "CSCO", "TMUS", "CMCSA", "AMGN", "TXN", "QCOM", "HON", "INTU", "BKNG", "ISRG", "SBUX", "MDLZ", "GILD", "ADP", "LRCX"]
-POOL_GPW = ["PKN.WA", "PKO.WA", "PZU.WA", "PEO.WA", "DNP.WA", "KGH.WA", "LPP.WA", "ALE.WA", "CDR.WA", "SPL.WA", "CPS.WA", "PGE.WA", "KRU.WA", "KTY.WA", "ACP.WA", "MBK.WA", "JSW.WA", "ALR.WA", "TPE.WA", "CCC.WA", "XTB.WA", "ENA.WA", "MIL.WA", "BHW.WA", "ING.WA", "KRY.WA", "BDX.WA", "TEN.WA", "11B.WA", "TXT.WA", "GPP.WA", "APR.WA", "ASB.WA", "BMC.WA", "CIG.WA", "DAT.WA", "DOM.WA", "EAT.WA", "EUR.WA", "GPW.WA", "GTN.WA", "HUG.WA", "KER.WA", "LWB.WA", "MAB.WA", "MBR.WA", "MDG.WA", "MRC.WA", "NEU.WA", "OAT.WA", "PCR.WA", "PEP.WA", "PKP.WA", "PLW.WA", "RBW.WA", "RVU.WA", "SLV.WA", "STP.WA", "TOR.WA", "VGO.WA", "WPL.WA"]
-BACKUP_NASDAQ = ["AAPL", "MSFT", "NVDA", "AMZN", "GOOGL", "META", "TSLA", "AVGO", "COST", "PEP", "AMD", "NFLX", "CSCO", "INTC", "TMUS", "CMCSA", "TXN", "AMAT", "QCOM", "HON", "INTU", "AMGN", "BKNG", "ISRG", "SBUX", "MDLZ", "GILD", "ADP", "LRCX", "ADI", "REGN", "VRTX", "MU", "PANW", "SNPS", "KLAC", "CDNS", "CHTR", "MELI", "MAR", "CSX", "PYPL", "MNST", "ORLY", "ASML", "NXPI", "CTAS", "WDAY", "FTNT", "KDP"]
-
-DOMAINS = {"AAPL": "apple.com", "MSFT": "microsoft.com", "NVDA": "nvidia.com", "GOOGL": "google.com", "AMZN": "amazon.com", "META": "meta.com", "TSLA": "tesla.com", "AMD": "amd.com", "NFLX": "netflix.com", "JPM": "jpmorganchase.com", "DIS": "disney.com", "AVGO": "broadcom.com", "PKN.WA": "orlen.pl", "PKO.WA": "pkobp.pl", "PZU.WA": "pzu.pl", "PEO.WA": "pekao.com.pl", "DNP.WA": "grupadino.pl", "KGH.WA": "kghm.com", "LPP.WA": "lpp.com", "ALE.WA": "allegro.eu", "CDR.WA": "cdprojekt.com", "SPL.WA": "santander.pl", "CPS.WA": "cyfrowypolsat.pl", "PGE.WA": "gkpge.pl", "CCC.WA": "ccc.eu", "XTB.WA": "xtb.com", "ING.WA": "ing.pl", "MBK.WA": "mbank.pl", "ALR.WA": "aliorbank.pl", "TPE.WA": "tauron.pl", "JSW.WA": "jsw.pl"}
-
-def format_large_num(num):
-    if num is None: return "-"
-    if num > 1e9: return f"{num/1e9:.2f}B"
-    if num > 1e6: return f"{num/1e6:.2f}M"
-    return f"{num:.2f}"
-
-# --- FUNKCJA DO KODOWANIA OBRAZKA NA BASE64 ---
-def get_img_as_base64(file_path):
-    try:
-        with open(file_path, "rb") as f:
-            data = f.read()
-        return base64.b64encode(data).decode()
-    except: return None
-
-@st.cache_data(ttl=3600)
-def get_full_tickers_v11(market):
-    headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"}
-    if market == "GPW": return POOL_GPW
-    if market == "Nasdaq 100":
-        try:
-            tables = pd.read_html(requests.get('https://en.wikipedia.org/wiki/Nasdaq-100', headers=headers).text)
-            for t in tables:
-                if 'Ticker' in t.columns: return [str(x).replace('.', '-') for x in t['Ticker'].tolist()]
-            return BACKUP_NASDAQ
-        except: return BACKUP_NASDAQ
-    if market == "S&P 500":
-        try:
-            url = "https://raw.githubusercontent.com/datasets/s-and-p-500-companies/master/data/constituents.csv"
-            return [str(x).replace('.', '-') for x in pd.read_csv(url)['Symbol'].tolist()]
-        except:
-            try:
-                tables = pd.read_html(requests.get('https://en.wikipedia.org/wiki/List_of_S%26P_500_companies', headers=headers).text)
-                return [str(x).replace('.', '-') for x in tables[0]['Symbol'].tolist()]
-            except: return POOL_SP500 
-    return []
-
-@st.cache_data(ttl=3600*4)
-def scan_fundamentals_v11(tickers_list):
-    fundamental_data = []
-    strong_buys = []
-    for t in tickers_list[:40]:
-        try:
-            stock = yf.Ticker(t)
-            info = stock.info
-            rev_growth = info.get('revenueGrowth', 0)
-            earn_growth = info.get('earningsGrowth', 0)
-            if not rev_growth or not earn_growth: continue
-            
-            score = (rev_growth * 100) + (earn_growth * 100)
-            eps_act = info.get('trailingEps', 0)
-            eps_est = info.get('forwardEps', eps_act * 0.95)
-            rev_act = info.get('totalRevenue', 0)
-            rev_est = rev_act * 0.98
-            
-            eps_diff_pct = ((eps_act - eps_est) / abs(eps_est)) * 100 if eps_est else 0
-            rev_diff_pct = ((rev_act - rev_est) / rev_est) * 100 if rev_est else 0
-            
-            domain = DOMAINS.get(t)
-            logo = f"https://logo.clearbit.com/{domain}" if domain else None
-            link = f"https://finance.yahoo.com/quote/{t}"
-            
-            data_pack = {
-                "ticker": t, "link": link, "logo": logo, "score": score,
-                "eps_est": round(eps_est, 2), "eps_act": round(eps_act, 2),
-                "eps_txt": f"{'Beat' if eps_diff_pct>=0 else 'Miss'} {abs(eps_diff_pct):.0f}%",
-                "eps_cls": "text-green" if eps_diff_pct>=0 else "text-red",
-                "rev_est": format_large_num(rev_est), "rev_act": format_large_num(rev_act),
-                "rev_txt": f"{'Beat' if rev_diff_pct>=0 else 'Miss'} {abs(rev_diff_pct):.0f}%",
-                "rev_cls": "text-green" if rev_diff_pct>=0 else "text-red",
-                "rev_growth": round(rev_growth*100, 1), "earn_growth": round(earn_growth*100, 1),
-                "g_rev_cls": "text-green" if rev_growth>0 else "text-red",
-                "g_eps_cls": "text-green" if earn_growth>0 else "text-red",
-                "recommendation": info.get('recommendationKey', 'none'),
-                "target_price": info.get('targetMeanPrice', 0),
-                "current_price": info.get('currentPrice', info.get('previousClose', 0))
-            }
-            fundamental_data.append(data_pack)
-            if data_pack['recommendation'] == 'strong_buy' and data_pack['target_price'] > data_pack['current_price']:
-                data_pack['upside'] = ((data_pack['target_price'] - data_pack['current_price']) / data_pack['current_price']) * 100
-                strong_buys.append(data_pack)
-        except: continue
-
-    fundamental_data.sort(key=lambda x: x['score'], reverse=True)
-    strong_buys.sort(key=lambda x: x.get('upside', 0), reverse=True)
-    return fundamental_data[:5], (strong_buys[0] if strong_buys else None)
-
-def analyze_stock_tech(ticker, strategy, params):
-    try:
-        data = yf.download(ticker, period="1y", progress=False, timeout=1, auto_adjust=False)
-        if len(data) < 50: return None
-        close = data['Close']
-        vol = data['Volume']
-        res = None
-        vol_confirm = True
-        if params.get('use_vol', False):
-            avg_vol = vol.rolling(20).mean().iloc[-1]
-            if vol.iloc[-1] < avg_vol * 1.2: vol_confirm = False
-
-        if vol_confirm:
-            if strategy == "RSI":
-                delta = close.diff()
-                gain = (delta.where(delta > 0, 0)).ewm(alpha=1/14, adjust=False).mean()
-                loss = (-delta.where(delta < 0, 0)).ewm(alpha=1/14, adjust=False).mean()
-                rsi = 100 - (100 / (1 + gain / loss))
-                curr = rsi.iloc[-1]
-                if curr <= params['rsi_threshold']:
-                    res = {"info": f"RSI: {round(curr, 1)} (Wyprzedanie)", "val": round(curr, 1), "name": "RSI"}
-            elif strategy == "SMA":
-                sma = close.rolling(window=params['sma_period']).mean()
-                if close.iloc[-1] > sma.iloc[-1]:
-                    res = {"info": "Cena nad SMA (Trend Wzrostowy)", "val": round(sma.iloc[-1], 2), "name": "SMA"}
-            elif strategy == "Bollinger":
-                sma = close.rolling(20).mean()
-                std = close.rolling(20).std()
-                low = sma - (2 * std)
-                if close.iloc[-1] <= low.iloc[-1] * 1.05:
-                    res = {"info": "Przy dolnej wstędze (Tani zakup)", "val": round(low.iloc[-1], 2), "name": "Low Band"}
-        if res:
-            return {"ticker": ticker, "price": round(close.iloc[-1], 2), "change": round(((close.iloc[-1]-close.iloc[-2])/close.iloc[-2])*100, 2), "details": res, "chart_data": data[['Close']].copy()}
-    except: return None
-    return None
-
-def get_market_overview_fixed(tickers):
+# --- ZASOBY (współdzielone przez sesje) ---
+@st.cache_resource
+def get_price_store():
+    return PriceStore(os.path.join(DATA_DIR, "prices"), chunk_size=SCAN_CHUNK_SIZE, retries=SCAN_RETRIES)
+
+@st.cache_resource
+def get_fundamentals_fetcher():
+    return FundamentalsFetcher(max_workers=FUND_WORKERS, timeout=FUND_TIMEOUT, rate=FUND_RATE, ttl=3600*4)
+
+@st.cache_resource
+def get_fundamentals_table():
+    return FundamentalsTable(os.path.join(DATA_DIR, "fundamentals"), get_fundamentals_fetcher(), ttl=3600*4, cache=get_shared_cache())
+
+@st.cache_resource
+def get_universe():
+    return UniverseService(os.path.join(DATA_DIR, "universe"))
+
+@st.cache_resource
+def get_shared_cache():
+    return SharedCache(os.path.join(DATA_DIR, "cache.sqlite"), max_bytes=CACHE_MAX_MB * 2**20, ttl=REFRESH_INTERVAL)
+
+@st.cache_resource
+def get_logos():
+    logos = LogoCache()
+    logos.prefetch(DOMAINS)  # w tle, przy pierwszym uruchomieniu procesu
+    return logos
+
+# Jeden wątek na proces, współdzielony przez wszystkie sesje
+@st.cache_resource
+def get_refresher():
+    return SnapshotRefresher(get_price_store(), get_fundamentals_table(), get_universe(), interval=REFRESH_INTERVAL, cache=get_shared_cache()).start()
+
+def render_scan_item(item):
+    with st.expander(f"{item.ticker} ({item.change}%) - {item.price}", expanded=True):
+        c1, c2 = st.columns([1,2])
+        with c1:
+            st.write(f"**Sygnał:** {' • '.join(d['info'] for d in item.details)}")
+            for d in item.details: st.metric(d['name'], d['val'])
+            st.link_button("👉 BiznesRadar" if ".WA" in item.ticker else "👉 Yahoo Finance", get_link(item.ticker))
+        with c2: st.line_chart(pd.Series(item.spark, name=item.ticker))
+
+def render_results_table(found):
+    st.dataframe(results_table(found), hide_index=True, use_container_width=True,
+                 column_config={"60 sesji": st.column_config.LineChartColumn("60 sesji", width="medium"), "Zmiana %": st.column_config.NumberColumn(format="%.2f")})
+
+# Wykresy powstają tylko dla bieżącej strony (lista) albo jako jeden wykres / jedna tabela
+def render_results(found):
+    view = st.radio("Widok wyników:", ["Tabela", "Lista", "Wykres zbiorczy"], horizontal=True, key="scan_view")
+    if view == "Tabela": render_results_table(found)
+    elif view == "Wykres zbiorczy": st.altair_chart(small_multiples(found))
+    else:
+        pages = -(-len(found) // RESULTS_PAGE)
+        page = st.number_input(f"Strona (z {pages}):", 1, pages, 1, key="scan_page") if pages > 1 else 1
+        for item in found[(page - 1) * RESULTS_PAGE:page * RESULTS_PAGE]: render_scan_item(item)
+
+# --- WATCHLISTA NA ŻYWO ---
+# Odświeżana jako fragment (st.fragment(run_every=...)) - reszta strony się nie przelicza,
+# a każda nowa cena aktualizuje stan wskaźników w O(1) (live.py)
+def live_panel(market, watch, strategies, params, tick_file):
+    key = (market, watch, strategies, tuple(sorted(params.items())), tick_file)
+    live = st.session_state.get('live')
+    if live is None or live['key'] != key:
+        frames, _ = get_price_store().get(market, list(watch))
+        live = st.session_state['live'] = {"key": key, "wl": LiveWatchlist(strategies, params).seed(frames), "alerts": [],
+                                           "feed": TickReplay(tick_file) if tick_file else None}
+    wl, feed = live['wl'], live['feed']
     try:
-        preview = tickers[:50] if len(tickers) > 50 else tickers
-        data = yf.download(preview, period="1mo", progress=False, timeout=5, group_by='ticker', auto_adjust=False)
-        valid_data = []
-        for t in preview:
-            try:
-                if t in data and not data[t]['Close'].empty:
-                    series = data[t]['Close'].dropna()
-                    if len(series) > 5:
-                        curr = series.iloc[-1]
-                        prev = series.iloc[-2]
-                        start = series.iloc[0]
-                        day_chg = ((curr - prev) / prev) * 100
-                        mon_chg = ((curr - start) / start) * 100
-                        if pd.notna(mon_chg) and pd.notna(day_chg):
-                            valid_data.append({"t": t, "p": curr, "c": day_chg, "mc": mon_chg})
-            except: continue
-        
-        leaders = []
-        count = 0
-        for item in valid_data:
-            if item['t'] in tickers[:15]:
-                leaders.append(item)
-                count += 1
-            if count >= 5: break
-            
-        gainers = [x for x in valid_data if x['mc'] > 0]
-        gainers.sort(key=lambda x: x['mc'], reverse=True)
-        gainers = gainers[:5]
-        
-        losers = [x for x in valid_data if x['mc'] < 0]
-        losers.sort(key=lambda x: x['mc']) 
-        losers = losers[:5]
-        
-        return leaders, gainers, losers
-    except Exception as e: return [], [], []
-
-def get_link(ticker):
-    if ".WA" in ticker: return f"https://www.biznesradar.pl/notowania/{ticker.replace('.WA', '')}"
-    return f"https://finance.yahoo.com/quote/{ticker}"
+        ticks = feed.next(LIVE_REPLAY_BATCH * len(wl.tickers)) if feed else poll_quotes(wl.tickers, source=get_price_store().source)
+    except Exception as e:
+        st.caption(f"⚠️ Nie udało się pobrać cen: {e}"); ticks = []
+    alerts = wl.update_many(ticks)
+    for a in alerts:
+        if a['wejście']: st.toast(f"🔔 {a['spółka'].replace('.WA','')}: {a['warunek']} ({a['cena']:.2f})")
+    live['alerts'] = (alerts[::-1] + live['alerts'])[:LIVE_ALERTS]
+    if wl.tickers: st.dataframe(wl.table().style.format(precision=2), hide_index=True, use_container_width=True)
+    if live['alerts']:
+        st.write("**🔔 Ostatnie alerty**")
+        st.dataframe(pd.DataFrame(live['alerts']).style.format(precision=2), hide_index=True, use_container_width=True)
+    st.caption(f"{wl.ticks} notowań • {datetime.now().strftime('%H:%M:%S')}{' • plik odtworzony do końca' if feed and feed.done else ''}")
 
 # --- RENDEROWANIE KROKODYLA (POPRAWIONE POZYCJONOWANIE) ---
 def render_strong_buy_section(best_pick):
@@ -264,27 +195,7 @@ def render_strong_buy_section(best_pick):
         st.info("Brak 'Strong Buy' w tej grupie.")
         return
 
-    # Auto-detekcja nazwy pliku
-    img_b64 = None
-    files = ["krokodyl_poleca.jpg", "krokodyl_poleca_wipe_bg.png", "krokodyl_poleca_wipe_bg.jpg", "krokodyl_poleca.png", "krokodyl.png"]
-    
-    for f in files:
-        if os.path.exists(f):
-            img_b64 = get_img_as_base64(f)
-            mime = "png" if f.endswith(".png") else "jpeg"
-            break
-    
-    if img_b64:
-        croc_src = f"data:image/{mime};base64,{img_b64}"
-    else:
-        croc_src = "https://cdn-icons-png.flaticon.com/512/2328/2328979.png"
-
-    e = best_pick
-    logo_div = f'<div class="logo-container"><img src="{e["logo"]}" class="big-logo"></div>' if e['logo'] else '<div class="logo-container" style="height:60px;"></div>'
-    
-    html_code = f"""<div class="strong-buy-wrapper"><img src="{croc_src}" class="croc-absolute"><div class="webull-card strong-buy-card-style"><div class="badge">STRONG BUY</div><div class="card-header"><a href="{e["link"]}" target="_blank">{e["ticker"].replace(".WA","")} 🔗</a></div><table class="webull-table"><thead><tr><th>Cel Cenowy</th><th>Potencjał</th><th>Wzrost EPS</th></tr></thead><tbody><tr><td>{e["target_price"]}</td><td class="text-green">+{e["upside"]:.1f}%</td><td class="{e["g_eps_cls"]}">{e["earn_growth"]}%</td></tr></tbody></table>{logo_div}<div class="bottom-stats" style="text-align:center;">Rekomendacja: <strong>STRONG BUY</strong><br>EPS Est: {e["eps_est"]}</div></div></div>"""
-    
-    st.markdown(html_code, unsafe_allow_html=True)
+    st.markdown(strong_buy_html(best_pick, mascot_src(), get_logos().src), unsafe_allow_html=True)
 
 # --- UI ---
 with st.sidebar:
@@ -293,39 +204,56 @@ with st.sidebar:
     st.divider()
     
     st.subheader("🛠️ Ustawienia Skanera")
-    strat = st.selectbox("Wybierz Strategię:", ["RSI (Wyprzedanie)", "SMA (Trend)", "Bollinger (Dołki)"])
+    strats = st.multiselect("Wybierz Strategie:", ["RSI (Wyprzedanie)", "SMA (Trend)", "Bollinger (Dołki)"], default=["RSI (Wyprzedanie)"])
+    combine = st.radio("Łączenie warunków:", ["AND", "OR"], horizontal=True, help="AND: spółka musi spełnić wszystkie warunki. OR: wystarczy jeden.") if len(strats) > 1 else "AND"
     
     params = {}
     
-    if "RSI" in strat:
+    if any("RSI" in s for s in strats):
         st.markdown('<div class="info-box"><span class="info-title">💡 Co to jest RSI?</span>Szuka spółek, które spadły "za nisko" i mogą odbić.<br>• <strong>< 30:</strong> Silna panika (Agresywnie)<br>• <strong>< 40-50:</strong> Korekta (Bezpieczniej)</div>', unsafe_allow_html=True)
         params['rsi_threshold'] = st.slider("Maksymalne RSI:", 20, 80, 40)
         
-    elif "SMA" in strat:
+    if any("SMA" in s for s in strats):
         st.markdown('<div class="info-box"><span class="info-title">💡 Co to jest SMA?</span>Gra z trendem. Szuka spółek, których cena jest powyżej średniej kroczącej.<br>• <strong>50 dni:</strong> Trend średnioterminowy<br>• <strong>200 dni:</strong> Trend długoterminowy</div>', unsafe_allow_html=True)
         params['sma_period'] = st.slider("Średnia (Dni):", 10, 200, 50)
         
-    elif "Bollinger" in strat:
+    if any("Bollinger" in s for s in strats):
         st.markdown('<div class="info-box"><span class="info-title">💡 Wstęgi Bollingera</span>Statystyczne odchylenie ceny. Skaner szuka momentów, gdy cena dotyka <strong>dolnej wstęgi</strong> (statystycznie "tani" moment na zakup).</div>', unsafe_allow_html=True)
+        params['bb_mult'] = st.slider("Tolerancja wstęgi (× dolna):", 1.00, 1.10, 1.05, 0.01)
 
     st.write("")
     params['use_vol'] = st.checkbox("🎯 Wymagaj wolumenu", value=False, help="Zaznacz, aby odsiać spółki z małym obrotem.")
     
+    show_timing = st.checkbox("⏱ Pomiar czasu etapów", value=False, help="Pokazuje, ile trwał każdy etap budowania strony.")
     st.caption(f"Aktualizacja: {datetime.now().strftime('%H:%M')}")
 
+if "GPW" in market_choice: market="GPW"
+elif "Nasdaq" in market_choice: market="Nasdaq 100"
+else: market="S&P 500"
+timer = StageTimer()
+refresher = get_refresher()
+
 c1, c2 = st.columns([3,1])
 with c1: st.title("📈 KOLgejt")
 with c2: 
     if st.button("⚡ ODŚWIEŻ DANE", type="primary", use_container_width=True):
+        with st.spinner("Odświeżam dane..."): refresher.refresh(market, force=True)
         st.rerun()
 
-if "GPW" in market_choice: market="GPW"; tickers_scan=get_full_tickers_v11("GPW"); tickers_fund=POOL_GPW
-elif "Nasdaq" in market_choice: market="Nasdaq 100"; tickers_scan=get_full_tickers_v11("Nasdaq 100"); tickers_fund=POOL_NASDAQ
-else: market="S&P 500"; tickers_scan=get_full_tickers_v11("S&P 500"); tickers_fund=POOL_SP500
+snap = refresher.get(market)
+if snap is None:
+    # Zimny start - pierwszy snapshot tego rynku liczymy raz, potem robi to wątek w tle
+    with st.spinner("Analiza trendów (pobieram dane)..."): snap = refresher.refresh(market)
+if snap is None:
+    st.error("Nie udało się pobrać danych rynkowych. Spróbuj odświeżyć za chwilę.")
+    st.stop()
+tickers_scan = snap['tickers']
+leaders, gainers, losers = snap['overview']
+top_funds, best_pick, fund_stats = snap['fundamentals']
+timer.lap("snapshot")
+st.caption(f"📦 Dane z {snap['at'].strftime('%H:%M:%S')} ({int(refresher.age(market) // 60)} min temu){' • ⚠️ ostatnie odświeżenie nieudane' if snap['error'] else ''}")
 
 st.subheader(f"🔥 Przepływ Rynku: {market}")
-with st.spinner("Analiza trendów (pobieram dane)..."): 
-    leaders, gainers, losers = get_market_overview_fixed(tickers_scan)
 
 cols = st.columns(5)
 for i, l in enumerate(leaders):
@@ -333,64 +261,86 @@ for i, l in enumerate(leaders):
 
 st.write("---")
 st.write("**🚀 Top Wzrosty (Miesiąc)**")
-if gainers:
-    html = '<div class="scroll-container">'
-    for g in gainers:
-        link = get_link(g["t"])
-        html += f'<a href="{link}" target="_blank" class="mini-link"><div class="mini-card mini-card-up"><div class="mini-ticker">{g["t"].replace(".WA","")} 🔗</div><div class="mini-price">{g["p"]:.2f}</div><div class="mini-change text-green">+{g["mc"]:.2f}%</div></div></a>'
-    html += "</div>"
-    st.markdown(html, unsafe_allow_html=True)
+if gainers: st.markdown(movers_html(gainers, up=True), unsafe_allow_html=True)
 else: st.write("Brak wyraźnych wzrostów w analizowanej próbie.")
 
 st.write("**🔻 Top Spadki (Miesiąc)**")
-if losers:
-    html = '<div class="scroll-container">'
-    for l in losers:
-        link = get_link(l["t"])
-        html += f'<a href="{link}" target="_blank" class="mini-link"><div class="mini-card mini-card-down"><div class="mini-ticker">{l["t"].replace(".WA","")} 🔗</div><div class="mini-price">{l["p"]:.2f}</div><div class="mini-change text-red">{l["mc"]:.2f}%</div></div></a>'
-    html += "</div>"
-    st.markdown(html, unsafe_allow_html=True)
+if losers: st.markdown(movers_html(losers, up=False), unsafe_allow_html=True)
 else: st.write("Brak wyraźnych spadków w analizowanej próbie.")
+timer.lap("przepływ rynku")
 
 st.divider()
 
-with st.spinner("Szukam perełek fundamentalnych..."):
-    top_funds, best_pick = scan_fundamentals_v11(tickers_fund)
-
 st.subheader("🏆 Analyst Strong Buy")
 render_strong_buy_section(best_pick)
+timer.lap("strong buy")
 
 st.write("---")
 st.subheader("💎 Top 5 Fundamentalnych")
-if top_funds:
-    html = '<div class="scroll-container">'
-    for e in top_funds:
-        logo_div = f'<div class="logo-container"><img src="{e["logo"]}" class="big-logo"></div>' if e['logo'] else '<div class="logo-container" style="height:60px;"></div>'
-        card = f'<div class="webull-card slider-card"><div class="card-header"><a href="{e["link"]}" target="_blank">{e["ticker"].replace(".WA","")} 🔗</a></div><table class="webull-table"><thead><tr><th>Wskaźnik</th><th>Prognoza</th><th>Wynik</th><th>Beat/Miss</th></tr></thead><tbody><tr><td>EPS</td><td>{e["eps_est"]}</td><td>{e["eps_act"]}</td><td class="{e["eps_cls"]}">{e["eps_txt"]}</td></tr><tr class="row-alt"><td>Przychód</td><td>{e["rev_est"]}</td><td>{e["rev_act"]}</td><td class="{e["rev_cls"]}">{e["rev_txt"]}</td></tr></tbody></table>{logo_div}<div class="bottom-stats"><div class="stat-row"><span>Rev r/r:</span><span class="{e["g_rev_cls"]}">{e["rev_growth"]}%</span></div><div class="stat-row"><span>EPS r/r:</span><span class="{e["g_eps_cls"]}">{e["earn_growth"]}%</span></div></div></div>'
-        html += card
-    html += "</div>"
-    st.markdown(html, unsafe_allow_html=True)
+if top_funds: st.markdown(fund_cards_html(top_funds, get_logos().src), unsafe_allow_html=True)
+if fund_stats['built_at']:
+    st.caption(f"Fundamenty: ranking {fund_stats['rows']} spółek w {fund_stats['rank_ms']:.0f} ms • tabela z {fund_stats['built_at'].replace('T', ' ')} ({fund_stats['failed']} bez danych, pobieranie p50 {fund_stats['p50']:.2f}s / p95 {fund_stats['p95']:.2f}s, razem {fund_stats['wall']:.1f}s)")
+if fund_stats['error']: st.caption(f"⚠️ Nieudana przebudowa tabeli fundamentów: {fund_stats['error']}")
+timer.lap("top 5 fundamentów")
 
 st.divider()
 st.subheader(f"📡 Skaner Techniczny ({len(tickers_scan)} spółek)")
-if st.button(f"🔍 SKANUJ CAŁY RYNEK", type="primary", use_container_width=True):
-    prog = st.progress(0); stat = st.empty(); found = []
-    scan_limit = len(tickers_scan)
-    for i, t in enumerate(tickers_scan):
-        if i%10==0: prog.progress((i+1)/scan_limit); stat.text(f"Analiza {i+1}/{scan_limit}: {t}")
-        res = analyze_stock_tech(t, strat.split()[0], params)
-        if res: found.append(res)
-    prog.empty(); stat.empty()
-    if found:
-        st.success(f"Znaleziono: {len(found)}")
-        for item in found:
-            with st.expander(f"{item['ticker']} ({item['change']}%) - {item['price']}", expanded=True):
-                c1, c2 = st.columns([1,2])
-                with c1:
-                    st.write(f"**Sygnał:** {item['details']['info']}")
-                    st.metric(item['details']['name'], item['details']['val'])
-                    if ".WA" in item['ticker']: link = f"https://www.biznesradar.pl/notowania/{item['ticker'].replace('.WA', '')}"; st.link_button("👉 BiznesRadar", link)
-                    else: link = f"https://finance.yahoo.com/quote/{item['ticker']}"; st.link_button("👉 Yahoo Finance", link)
-                with c2: st.line_chart(item['chart_data'].tail(60))
-    else: st.warning("Brak wyników.")
+uni = snap['universe']
+st.caption(f"Skład indeksu: {uni['source']} • wersja {uni['version']} • {uni['count']} spółek • sprawdzono {uni['checked_at'].replace('T', ' ')}")
+if uni['fallback']: st.warning(f"⚠️ Źródło składu indeksu niedostępne - skanuję awaryjną listę {uni['count']} spółek. {uni['error'] or ''}")
+c_scan, c_stop = st.columns([4,1])
+with c_scan: start_scan = st.button(f"🔍 SKANUJ CAŁY RYNEK", type="primary", use_container_width=True)
+# Kliknięcie STOP przerywa bieżący przebieg skryptu (a z nim generator skanu);
+# dotychczasowe trafienia zostają w session_state i są pokazane po przeładowaniu
+with c_stop: st.button("⏹ STOP", use_container_width=True)
+scan_rule = build_rule([s.split()[0] for s in strats], params, combine)
+scan_key = (market, scan_rule.name if scan_rule else None)
+
+if start_scan and scan_rule is None:
+    st.warning("Wybierz co najmniej jedną strategię.")
+elif start_scan:
+    st.caption(f"Reguła: {scan_rule.name}")
+    scan = st.session_state['scan'] = {"key": scan_key, "found": [], "failed": [], "done": 0, "total": len(tickers_scan), "complete": False}
+    st.session_state.pop('scan_page', None)
+    prog = st.progress(0); stat = st.empty(); summary = st.empty(); live = st.empty()
+    store = get_price_store()
+    for ev in iter_scan(tickers_scan, scan_rule, fetch=lambda chunk: store.get(market, chunk), chunk_size=SCAN_CHUNK_SIZE):
+        scan['found'] += ev['found']; scan['failed'] += ev['failed']; scan['done'] = ev['done']
+        prog.progress(ev['done']/ev['total'])
+        eta = f"{ev['eta']:.0f}s" if ev['eta'] is not None else "-"
+        stat.text(f"Analiza {ev['done']}/{ev['total']} • {ev['rate']:.0f} spółek/s • pozostało ~{eta}")
+        summary.success(f"Znaleziono: {len(scan['found'])}")
+        # W trakcie skanu jedna tabela podmieniana co paczkę zamiast widżetu na każde trafienie
+        if ev['found']:
+            with live.container(): render_results_table(scan['found'])
+    scan['complete'] = True
+    prog.empty(); stat.empty(); summary.empty(); live.empty()
+
+scan = st.session_state.get('scan')
+if scan and scan['key'] == scan_key:
+    if not scan['complete']: st.info(f"⏹ Skan przerwany po {scan['done']}/{scan['total']} spółkach.")
+    if scan['failed']: st.caption(f"⚠️ Brak danych dla {len(scan['failed'])} spółek: {', '.join(scan['failed'][:10])}{'...' if len(scan['failed']) > 10 else ''}")
+    if scan['found']:
+        st.success(f"Znaleziono: {len(scan['found'])}")
+        render_results(scan['found'])
+    elif scan['complete']: st.warning("Brak wyników.")
+timer.lap("skaner")
 
+st.divider()
+st.subheader("🟢 Watchlista na żywo")
+if st.toggle("Włącz podgląd na żywo", value=False, help="Wskaźniki liczone przyrostowo z każdej nowej ceny, alert przy przecięciu progu."):
+    found = scan['found'] if scan and scan['key'] == scan_key else []
+    c_w, c_src = st.columns([3,1])
+    with c_w: watch = st.multiselect("Spółki:", tickers_scan, default=[r.ticker for r in found[:5]] or tickers_scan[:5], max_selections=LIVE_MAX)
+    with c_src: src = st.radio("Źródło cen:", ["Yahoo", "Plik z tickami"], help="Plik CSV: time,ticker,price - odtwarzanie do testów poza sesją.")
+    tick_file = st.text_input("Plik z tickami:", os.path.join(DATA_DIR, "ticks.csv")) if src == "Plik z tickami" else None
+    live_strats = tuple(s.split()[0] for s in strats) or ("RSI",)
+    if watch: st.fragment(run_every=LIVE_REPLAY if tick_file else LIVE_POLL)(live_panel)(market, tuple(watch), live_strats, params, tick_file)
+timer.lap("na żywo")
+
+if show_timing:
+    with st.expander("⏱ Czas etapów", expanded=True):
+        st.dataframe(pd.DataFrame(timer.records).set_index("stage").style.format({"wall_s": "{:.3f}"}), use_container_width=True)
+        st.caption(f"Razem: {timer.total():.3f}s • snapshot w tle liczony {snap['took']:.1f}s")
+        cs = get_shared_cache().stats()
+        st.caption(f"Wspólny cache: {cs['hits']} trafień • {cs['misses']} pobrań • {cs['coalesced']} połączonych żądań • {cs['entries']} wpisów ({cs['bytes'] / 2**20:.1f} MB)")
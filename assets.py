@@ -0,0 +1,118 @@
+import os
+import io
+import time
+import base64
+import threading
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+import requests
+
+try:
+    from PIL import Image
+except ImportError:  # bez Pillow obrazy idą w oryginale (bez skalowania)
+    Image = None
+
+# --- ZASOBY STATYCZNE (krokodyl i logotypy spółek) ---
+# Obrazki przygotowujemy raz i serwujemy jako pliki statyczne Streamlit
+# (.streamlit/config.toml: enableStaticServing), więc HTML karty zawiera tylko krótki
+# adres zamiast ~650 KB base64 przy każdym przeładowaniu strony.
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STATIC_DIR = os.path.join(BASE_DIR, "static")
+STATIC_URL = "app/static"
+CROC_FILES = ["krokodyl_poleca.jpg", "krokodyl_poleca_wipe_bg.png", "krokodyl_poleca_wipe_bg.jpg", "krokodyl_poleca.png", "krokodyl.png"]
+CROC_FALLBACK = "https://cdn-icons-png.flaticon.com/512/2328/2328979.png"
+MASCOT_WIDTH = 300          # 2× szerokości w CSS (150px), żeby był ostry na ekranach HiDPI
+LOGO_SIZE = 100             # logo wyświetlane w 50px
+LOGO_PLACEHOLDER = f"{STATIC_URL}/logo_placeholder.svg"
+LOGO_SOURCES = ["https://logo.clearbit.com/{domain}", "https://www.google.com/s2/favicons?domain={domain}&sz=128"]
+
+def _encode(img, width):
+    # RGBA -> WebP (przezroczystość zostaje); bez obsługi WebP w Pillow -> PNG
+    if img.width > width: img = img.resize((width, round(img.height * width / img.width)), Image.LANCZOS)
+    buf = io.BytesIO()
+    try:
+        img.save(buf, "WEBP", quality=85, method=4); return buf.getvalue(), "webp"
+    except (KeyError, OSError):
+        buf = io.BytesIO(); img.save(buf, "PNG", optimize=True); return buf.getvalue(), "png"
+
+@lru_cache(maxsize=1)
+def mascot_src(static_dir=STATIC_DIR):
+    # Raz na proces: znajdź plik, zmniejsz, zapisz do static/. Gdy katalog nie jest
+    # zapisywalny - mały data URI (też liczony raz).
+    src = next((p for p in (os.path.join(BASE_DIR, f) for f in CROC_FILES) if os.path.exists(p)), None)
+    if src is None: return CROC_FALLBACK
+    try:
+        if Image is not None:
+            with Image.open(src) as img: data, ext = _encode(img, MASCOT_WIDTH)
+        else:
+            with open(src, "rb") as f: data = f.read()
+            ext = src.rsplit(".", 1)[-1].replace("jpg", "jpeg")
+    except Exception:
+        return CROC_FALLBACK
+    name = f"mascot.{ext}"
+    try:
+        os.makedirs(static_dir, exist_ok=True)
+        with open(os.path.join(static_dir, name), "wb") as f: f.write(data)
+        return f"{STATIC_URL}/{name}?v={len(data)}"
+    except OSError:
+        return f"data:image/{ext};base64,{base64.b64encode(data).decode()}"
+
+class LogoCache:
+    # Logotypy pobierane raz do static/logos/; do czasu pobrania (albo gdy źródła
+    # zawiodą) karta dostaje placeholder zamiast hot-linku do zewnętrznego serwisu
+    def __init__(self, root=os.path.join(STATIC_DIR, "logos"), timeout=5, fail_ttl=3600*24, max_workers=4, http_get=None):
+        self.root = root
+        self.timeout = timeout
+        self.fail_ttl = fail_ttl
+        self.http_get = http_get or requests.get
+        self._files = {}        # ticker -> nazwa pliku
+        self._failed = {}       # ticker -> czas ostatniej nieudanej próby
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="logos")
+        os.makedirs(root, exist_ok=True)
+        for f in os.listdir(root):
+            if not f.endswith(".tmp"): self._files[f.rsplit(".", 1)[0]] = f
+
+    @staticmethod
+    def _key(ticker):
+        return ticker.replace(".", "_").replace("/", "_")
+
+    def src(self, ticker, domain):
+        # Adres dla <img>; brak domeny = brak logo (None)
+        if not domain: return None
+        f = self._files.get(self._key(ticker))
+        if f: return f"{STATIC_URL}/{os.path.basename(self.root)}/{f}"
+        self.prefetch({ticker: domain})
+        return LOGO_PLACEHOLDER
+
+    def prefetch(self, domains):
+        now = time.time()
+        with self._lock:
+            todo = [(t, d) for t, d in domains.items() if d and self._key(t) not in self._files and t not in self._pending
+                    and now - self._failed.get(t, 0) > self.fail_ttl]
+            self._pending.update(t for t, _ in todo)
+        for t, d in todo: self._pool.submit(self._download, t, d)
+
+    def _download(self, ticker, domain):
+        try:
+            for tpl in LOGO_SOURCES:
+                try:
+                    r = self.http_get(tpl.format(domain=domain), timeout=self.timeout)
+                    if r.status_code != 200 or not r.content: continue
+                    data, ext = r.content, "png"
+                    if Image is not None:
+                        with Image.open(io.BytesIO(data)) as img:
+                            img = img.convert("RGBA"); img.thumbnail((LOGO_SIZE, LOGO_SIZE))
+                            buf = io.BytesIO(); img.save(buf, "PNG", optimize=True); data = buf.getvalue()
+                    name = f"{self._key(ticker)}.{ext}"
+                    with open(os.path.join(self.root, name + ".tmp"), "wb") as f: f.write(data)
+                    os.replace(os.path.join(self.root, name + ".tmp"), os.path.join(self.root, name))
+                    self._files[self._key(ticker)] = name
+                    return
+                except Exception:
+                    continue
+            self._failed[ticker] = time.time()
+        finally:
+            with self._lock: self._pending.discard(ticker)
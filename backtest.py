@@ -0,0 +1,116 @@
+import time
+import argparse
+import numpy as np
+import pandas as pd
+from indicators import panel_matrices, prefix_sums, sma_cumsum
+from rules import IndicatorCache, RSIBelow, AboveSMA, NearLowerBand
+
+# --- BACKTEST STRATEGII SKANERA ---
+# Te same reguły co w skanerze (rules.py), ale liczone dla każdej sesji historii naraz:
+# maska sygnałów daty × tickery, przyszłe stopy zwrotu przez shift, portfel równoważony
+# ze spółek z sygnałem z poprzedniej sesji. Bez pętli po dniach.
+
+HORIZONS = (5, 20, 60)
+
+def default_strategies(rsi_threshold=40, sma_period=50, bb_mult=1.05):
+    return {
+        f"RSI ≤ {rsi_threshold}": RSIBelow(rsi_threshold),
+        f"Cena > SMA({sma_period})": AboveSMA(sma_period),
+        f"Dolna wstęga × {bb_mult}": NearLowerBand(bb_mult),
+    }
+
+class Prepared:
+    # Wspólne dla wszystkich strategii na danym rynku: wskaźniki, przyszłe i dzienne zwroty
+    def __init__(self, close, volume, horizons=HORIZONS):
+        self.ind = IndicatorCache(close, volume, aligned=True, fast=True)
+        self.horizons = horizons
+        self.valid = close.notna().to_numpy()
+        self.fwd, self.fwd_ok, self.fwd_up = {}, {}, {}
+        for h in horizons:
+            r = forward_returns(close, h).to_numpy()
+            self.fwd_ok[h] = ~np.isnan(r)
+            self.fwd_up[h] = r > 0
+            self.fwd[h] = np.where(self.fwd_ok[h], r, 0.0)
+        daily = close.pct_change(fill_method=None).to_numpy()
+        self.daily = np.where(np.isnan(daily), 0.0, daily)
+
+def forward_returns(close, h):
+    return close.shift(-h) / close - 1
+
+def evaluate_mask(prep, signals):
+    sig = signals.to_numpy(dtype=bool) & prep.valid
+    sigf = sig.astype(float)
+    row = {"sygnały": int(np.count_nonzero(sig))}
+    for h in prep.horizons:
+        n = np.count_nonzero(sig & prep.fwd_ok[h])
+        row[f"trafność {h}d"] = np.count_nonzero(sig & prep.fwd_up[h]) / n if n else np.nan
+        row[f"śr. zwrot {h}d"] = float(np.vdot(sigf, prep.fwd[h])) / n if n else np.nan
+
+    # Portfel: równe wagi w spółkach z sygnałem na zamknięciu poprzedniej sesji
+    count = sigf.sum(axis=1, keepdims=True)
+    weights = sigf / np.where(count > 0, count, 1.0)
+    port = np.concatenate([[0.0], np.einsum("ij,ij->i", weights[:-1], prep.daily[1:])])
+    equity = np.cumprod(1 + port)
+    row["zwrot portfela"] = float(equity[-1] - 1) if len(equity) else np.nan
+    row["max obsunięcie"] = float((equity / np.maximum.accumulate(equity) - 1).min()) if len(equity) else np.nan
+    # Obrót: średnia dzienna połowa sumy zmian wag (0 = portfel stoi, 1 = wymiana całości)
+    row["obrót dzienny"] = float((np.abs(np.diff(weights, axis=0)).sum(axis=1) / 2).mean()) if len(weights) > 1 else np.nan
+    return row
+
+def run_backtest(close, volume, strategies, horizons=HORIZONS):
+    prep = Prepared(close, volume, horizons)
+    return pd.DataFrame({name: evaluate_mask(prep, rule.mask(prep.ind)) for name, rule in strategies.items()}).T
+
+def backtest_markets(panels, strategies, horizons=HORIZONS):
+    # panels: {rynek: (close, volume)} -> tabela z indeksem (rynek, strategia)
+    return pd.concat({m: run_backtest(c, v, strategies, horizons) for m, (c, v) in panels.items()}, names=["rynek", "strategia"])
+
+# --- PRZEGLĄD PARAMETRÓW (zakresy sliderów z sidebara) ---
+def sweep_rsi(close, volume, thresholds=range(20, 81), horizons=HORIZONS):
+    prep = Prepared(close, volume, horizons)  # RSI liczone raz, zmienia się tylko próg
+    return pd.DataFrame({x: evaluate_mask(prep, RSIBelow(x).mask(prep.ind)) for x in thresholds}).T.rename_axis("rsi_threshold")
+
+def sweep_sma(close, volume, periods=range(10, 201), horizons=HORIZONS):
+    prep = Prepared(close, volume, horizons)
+    sums = prefix_sums(prep.ind.close)  # sumy skumulowane raz; każdej SMA nie trzymamy w cache
+    return pd.DataFrame({n: evaluate_mask(prep, prep.ind.close > sma_cumsum(prep.ind.close, n, sums)) for n in periods}).T.rename_axis("sma_period")
+
+# --- CLI: python backtest.py --synthetic 500 --years 5   albo   --store data/prices --market GPW ---
+def load_panels(args):
+    if args.store:
+        from price_store import PriceStore
+        store = PriceStore(args.store)
+        return {m: panel_matrices(store.frames(m)) for m in args.market}
+    from providers import FakeProvider
+    fp = FakeProvider()
+    panels = {}
+    for m in args.market:
+        tickers = [f"{m[:3]}{i:04d}" for i in range(args.synthetic)]
+        start = (fp.end - pd.DateOffset(years=args.years)).strftime("%Y-%m-%d")
+        data = fp(tickers, start=start)
+        panels[m] = panel_matrices({t: data[t] for t in tickers})
+    return panels
+
+def main():
+    ap = argparse.ArgumentParser(description="Backtest strategii skanera (offline)")
+    ap.add_argument("--market", nargs="+", default=["US", "GPW"])
+    ap.add_argument("--store", help="katalog PriceStore z zapisanymi notowaniami (bez sieci)")
+    ap.add_argument("--synthetic", type=int, default=500, help="liczba syntetycznych spółek na rynek")
+    ap.add_argument("--years", type=int, default=5)
+    ap.add_argument("--sweep", action="store_true", help="przegląd rsi_threshold 20-80 i sma_period 10-200")
+    args = ap.parse_args()
+
+    pd.set_option("display.width", 200); pd.set_option("display.max_columns", 20)
+    panels = load_panels(args)
+    t0 = time.perf_counter()
+    print(backtest_markets(panels, default_strategies()).round(4))
+    print(f"\nbacktest: {time.perf_counter() - t0:.2f}s")
+    if args.sweep:
+        for m, (close, volume) in panels.items():
+            t0 = time.perf_counter(); rsi = sweep_rsi(close, volume); t_rsi = time.perf_counter() - t0
+            t0 = time.perf_counter(); sma = sweep_sma(close, volume); t_sma = time.perf_counter() - t0
+            print(f"\n[{m}] RSI 20-80 ({len(rsi)} progów): {t_rsi:.2f}s, SMA 10-200 ({len(sma)} okresów): {t_sma:.2f}s")
+            print(rsi.loc[::10, ["sygnały", "trafność 20d", "śr. zwrot 20d", "max obsunięcie"]].round(4).to_string())
+
+if __name__ == "__main__":
+    main()
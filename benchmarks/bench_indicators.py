@@ -0,0 +1,117 @@
+import os
+import sys
+import time
+import argparse
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from rules import IndicatorCache, build_rule, match_matrix, RSIBelow, AboveSMA, NearLowerBand
+
+# --- BENCHMARK: skaner per spółka vs silnik wektorowy ---
+# python benchmarks/bench_indicators.py [--sizes 500 5000] [--days 252]
+
+STRATEGIES = [("RSI", {"rsi_threshold": 40}), ("SMA", {"sma_period": 50}), ("Bollinger", {}), ("RSI", {"rsi_threshold": 80, "use_vol": True})]
+
+def synthetic_matrices(n_tickers, n_days, seed=0, gaps=True):
+    rng = np.random.default_rng(seed)
+    idx = pd.bdate_range(end="2026-10-16", periods=n_days)
+    cols = [f"T{i:05d}" for i in range(n_tickers)]
+    close = pd.DataFrame(50 * np.exp(np.cumsum(rng.normal(0, 0.02, (n_days, n_tickers)), axis=0)), index=idx, columns=cols)
+    volume = pd.DataFrame(rng.integers(100_000, 5_000_000, (n_days, n_tickers)).astype(float), index=idx, columns=cols)
+    if gaps:
+        # Świeże debiuty, zawieszenia notowań i spółki z krótką historią
+        close.iloc[:rng.integers(1, n_days), ::7] = np.nan
+        close.iloc[n_days // 2:n_days // 2 + 3, 3::11] = np.nan
+        close.iloc[:-40, 5::97] = np.nan
+        volume[close.isna()] = np.nan
+    return close, volume
+
+# Dawny skaner per spółka (sprzed rules.py) - wzorzec zgodności dla silnika wektorowego
+def analyze_stock_tech(ticker, data, strategy, params):
+    try:
+        if len(data) < 50: return None
+        close = data['Close']
+        vol = data['Volume']
+        res = None
+        vol_confirm = True
+        if params.get('use_vol', False):
+            avg_vol = vol.rolling(20).mean().iloc[-1]
+            if vol.iloc[-1] < avg_vol * 1.2: vol_confirm = False
+
+        if vol_confirm:
+            if strategy == "RSI":
+                delta = close.diff()
+                gain = (delta.where(delta > 0, 0)).ewm(alpha=1/14, adjust=False).mean()
+                loss = (-delta.where(delta < 0, 0)).ewm(alpha=1/14, adjust=False).mean()
+                rsi = 100 - (100 / (1 + gain / loss))
+                curr = rsi.iloc[-1]
+                if curr <= params['rsi_threshold']:
+                    res = {"info": f"RSI: {round(curr, 1)} (Wyprzedanie)", "val": round(curr, 1), "name": "RSI"}
+            elif strategy == "SMA":
+                sma = close.rolling(window=params['sma_period']).mean()
+                if close.iloc[-1] > sma.iloc[-1]:
+                    res = {"info": "Cena nad SMA (Trend Wzrostowy)", "val": round(sma.iloc[-1], 2), "name": "SMA"}
+            elif strategy == "Bollinger":
+                sma = close.rolling(20).mean()
+                std = close.rolling(20).std()
+                low = sma - (2 * std)
+                if close.iloc[-1] <= low.iloc[-1] * 1.05:
+                    res = {"info": "Przy dolnej wstędze (Tani zakup)", "val": round(low.iloc[-1], 2), "name": "Low Band"}
+        if res:
+            return {"ticker": ticker, "price": round(close.iloc[-1], 2), "change": round(((close.iloc[-1]-close.iloc[-2])/close.iloc[-2])*100, 2), "details": res}
+    except: return None
+    return None
+
+def per_ticker(close, volume, strategy, params):
+    found = {}
+    for t in close.columns:
+        data = pd.DataFrame({"Close": close[t], "Volume": volume[t]}).dropna(subset=['Close'])
+        res = analyze_stock_tech(t, data, strategy, params)
+        if res: found[t] = (res['price'], res['change'], res['details']['val'])
+    return found
+
+def vectorized(close, volume, strategy, params):
+    ind = IndicatorCache(close, volume)
+    rule = build_rule([strategy], params)
+    matrix = match_matrix(ind, rule)
+    last, prev = ind.close.iloc[-1], ind.close.iloc[-2]
+    leaf = rule.leaves()[0]
+    return {t: (round(last[t], 2), round(((last[t]-prev[t])/prev[t])*100, 2), leaf.details(ind, t)['val']) for t in matrix.index[matrix['match']]}
+
+def all_in_one(close, volume):
+    # Wszystkie trzy strategie w jednym przebiegu (wspólny IndicatorCache)
+    ind = IndicatorCache(close, volume)
+    return match_matrix(ind, RSIBelow(40) | AboveSMA(50) | NearLowerBand(1.05))
+
+def check_parity(close, volume):
+    for strategy, params in STRATEGIES:
+        a, b = per_ticker(close, volume, strategy, params), vectorized(close, volume, strategy, params)
+        assert a == b, f"{strategy} {params}: {len(a)} vs {len(b)} trafień, różnice: {set(a.items()) ^ set(b.items())}"
+    return True
+
+def timed(fn, *args):
+    t0 = time.perf_counter(); fn(*args); return time.perf_counter() - t0
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", type=int, nargs="+", default=[500, 5000])
+    ap.add_argument("--days", type=int, default=252)
+    ap.add_argument("--baseline-max", type=int, default=500, help="pętla per spółka tylko do tylu tickerów")
+    args = ap.parse_args()
+
+    close, volume = synthetic_matrices(300, args.days, seed=1)
+    print(f"parity (300 tickerów, {len(STRATEGIES)} strategie): {'OK' if check_parity(close, volume) else 'FAIL'}")
+
+    for n in args.sizes:
+        close, volume = synthetic_matrices(n, args.days)
+        vec = timed(lambda: [vectorized(close, volume, s, p) for s, p in STRATEGIES[:3]])
+        one = timed(all_in_one, close, volume)
+        line = f"{n:>6} tickerów: wektorowo {vec:.3f}s (3 skany), jeden przebieg 3 reguł {one:.3f}s"
+        if n <= args.baseline_max:
+            base = timed(lambda: [per_ticker(close, volume, s, p) for s, p in STRATEGIES[:3]])
+            line += f", per spółka {base:.3f}s (x{base / vec:.0f})"
+        print(line)
+
+if __name__ == "__main__":
+    main()
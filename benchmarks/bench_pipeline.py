@@ -0,0 +1,144 @@
+import os
+import sys
+import json
+import time
+import shutil
+import zlib
+import argparse
+from contextlib import contextmanager
+import platform
+import tempfile
+import subprocess
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from providers import FakeProvider
+from universe import UniverseService
+from price_store import PriceStore
+from fundamentals import FundamentalsFetcher, FundamentalsTable, rank
+from overview import get_market_overview_fixed
+from scanner import iter_scan
+from rules import build_rule
+from markets import DOMAINS
+from render import movers_html, strong_buy_html, fund_cards_html
+from assets import mascot_src, LogoCache
+from profiling import StageTimer
+
+# --- BENCHMARK CAŁEGO POTOKU DASHBOARDU (bez sieci) ---
+# Każdy etap strony osobno, zimny i ciepły start, dla kilku rozmiarów rynku:
+# czas, szczyt pamięci (tracemalloc) i liczba wywołań "dostawców".
+# python benchmarks/bench_pipeline.py [--sizes 30 500 5000] [--out wyniki.json] [--no-memory]
+
+MARKET = "S&P 500"
+RULE = build_rule(["RSI", "SMA", "Bollinger"], {"rsi_threshold": 40, "sma_period": 50, "bb_mult": 1.05}, combine="OR")
+
+class FakeHTTP:
+    # Odpowiedzi źródła składu indeksu: CSV z n symbolami, 304 przy zgodnym ETag
+    def __init__(self, n):
+        self.text = "Symbol\n" + "\n".join(f"T{i:05d}" for i in range(n))
+        self.calls = 0
+
+    def __call__(self, url, headers=None, timeout=None):
+        self.calls += 1
+        etag = '"v1"'
+        r = type("Response", (), {})()
+        r.status_code = 304 if (headers or {}).get("If-None-Match") == etag else 200
+        r.headers, r.text = {"ETag": etag}, self.text
+        r.raise_for_status = lambda: None
+        return r
+
+class FakeInfo:
+    # Deterministyczne yf.Ticker(t).info; co dziesiąta spółka bez danych
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, ticker):
+        self.calls += 1
+        rng = np.random.default_rng(zlib.crc32(ticker.encode()))
+        if rng.random() < 0.1: return {}
+        price = float(rng.uniform(10, 500))
+        return {"revenueGrowth": float(rng.normal(0.08, 0.15)), "earningsGrowth": float(rng.normal(0.1, 0.3)),
+                "trailingEps": float(rng.uniform(-2, 15)), "totalRevenue": float(rng.uniform(1e8, 5e11)),
+                "recommendationKey": rng.choice(["buy", "hold", "strong_buy"]), "targetMeanPrice": price * float(rng.uniform(0.8, 1.6)),
+                "currentPrice": price, "website": f"https://www.{ticker.lower()}.com"}
+
+def git_rev():
+    try: return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True).stdout.strip() or None
+    except Exception: return None
+
+def run_size(n, memory=True):
+    tmp = tempfile.mkdtemp(prefix="kolgejt-bench-")
+    http, info, fp = FakeHTTP(n), FakeInfo(), FakeProvider()
+    timer = StageTimer(memory=memory)
+
+    def calls(): return {"http": http.calls, "info": info.calls, "prices": len(fp.calls), "tickers_requested": fp.tickers_requested}
+    @contextmanager
+    def stage(name):
+        # liczniki w rekordzie = przyrost w danym etapie
+        before = calls()
+        with timer.stage(name, n=n) as rec:
+            yield rec
+            rec["calls"] = {k: v - before[k] for k, v in calls().items()}
+
+    try:
+        uni_root, px_root = os.path.join(tmp, "universe"), os.path.join(tmp, "prices")
+        with stage("universe: zimny start"): tickers = UniverseService(uni_root, http_get=http).tickers(MARKET)
+        with stage("universe: snapshot z dysku"): UniverseService(uni_root, http_get=http).tickers(MARKET)
+        uni = UniverseService(uni_root, http_get=http)
+        with stage("universe: sprawdzenie 304"): uni.refresh(MARKET)
+
+        store = PriceStore(px_root, source=fp)
+        with stage("przegląd: zimny start"): overview = get_market_overview_fixed(tickers, MARKET, store)
+        with stage("przegląd: ciepły"): get_market_overview_fixed(tickers, MARKET, store)
+        with stage("notowania: pełne pobranie"): store.get(MARKET, tickers)
+        store = PriceStore(px_root, source=fp)
+        with stage("notowania: odczyt z dysku"): store.get(MARKET, tickers)
+
+        funds = FundamentalsTable(os.path.join(tmp, "fundamentals"), FundamentalsFetcher(max_workers=8, rate=0, info_fn=info))
+        with stage("fundamenty: budowa tabeli"): tab, _ = funds.build(MARKET, tickers)
+        with stage("fundamenty: odczyt tabeli"): tab, _ = FundamentalsTable(funds.root).latest(MARKET)
+        with stage("fundamenty: ranking"): top_funds, best_pick = rank(tab, DOMAINS)
+
+        with stage("skaner: strumień") as rec:
+            found = [x for ev in iter_scan(tickers, RULE, fetch=lambda chunk: store.get(MARKET, chunk)) for x in ev['found']]
+            rec["found"] = len(found)
+
+        _, gainers, losers = overview
+        logos = LogoCache(os.path.join(tmp, "logos"), http_get=lambda url, timeout=None: None)
+        with stage("HTML kart") as rec:
+            html = movers_html(gainers, up=True) + movers_html(losers, up=False) + fund_cards_html(top_funds, logos.src)
+            if best_pick: html += strong_buy_html(best_pick, mascot_src(os.path.join(tmp, "static")), logos.src)
+            rec["html_bytes"] = len(html.encode())
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return timer.records
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark potoku dashboardu (offline)")
+    ap.add_argument("--sizes", type=int, nargs="+", default=[30, 500, 5000])
+    ap.add_argument("--out", help="zapis wyników do pliku JSON (porównanie przed/po zmianie)")
+    ap.add_argument("--no-memory", action="store_true", help="bez tracemalloc (dokładniejsze czasy)")
+    args = ap.parse_args()
+
+    results = []
+    for n in args.sizes:
+        t0 = time.perf_counter()
+        records = run_size(n, memory=not args.no_memory)
+        results += records
+        print(f"\n=== {n} spółek ({time.perf_counter() - t0:.1f}s) ===")
+        for r in records:
+            mem = f"{r['peak_mb']:8.1f} MB" if "peak_mb" in r else ""
+            c = r["calls"]
+            print(f"{r['stage']:<28} {r['wall_s']:8.3f}s {mem}  http={c['http']} info={c['info']} notowania={c['prices']} ({c['tickers_requested']} spółek)")
+
+    report = {"meta": {"at": pd.Timestamp.now().isoformat(timespec="seconds"), "git": git_rev(), "python": platform.python_version(),
+                       "pandas": pd.__version__, "numpy": np.__version__, "memory": not args.no_memory, "sizes": args.sizes},
+              "results": results}
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f: json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"\nZapisano: {args.out}")
+
+if __name__ == "__main__":
+    main()
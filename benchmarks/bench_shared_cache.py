@@ -0,0 +1,145 @@
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import threading
+import multiprocessing as mp
+from datetime import datetime, timedelta, timezone
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from providers import FakeProvider
+from universe import UniverseService
+from price_store import PriceStore
+from fundamentals import FundamentalsFetcher, FundamentalsTable
+from refresher import SnapshotRefresher
+from shared_cache import SharedCache, make_key
+from bench_pipeline import FakeHTTP, FakeInfo
+
+# --- WSPÓLNY CACHE: kilka procesów (replik) odświeża ten sam rynek naraz ---
+# Bez cache każdy proces pobiera skład, notowania i fundamenty sam; z SharedCache
+# powinien to zrobić dokładnie jeden, reszta czeka na jego wynik. Magazyn notowań jest,
+# jak w aplikacji, jednym katalogiem wspólnym dla wszystkich procesów.
+# python benchmarks/bench_shared_cache.py [--procs 4] [--threads 8] [--tickers 500]
+
+MARKET = "S&P 500"
+
+class SlowInfo(FakeInfo):
+    def __call__(self, ticker):
+        time.sleep(0.005)
+        return super().__call__(ticker)
+
+def replica(i, root, n, use_cache, barrier, out):
+    cache = SharedCache(os.path.join(root, "cache.sqlite")) if use_cache else None
+    http, info, fp = FakeHTTP(n), SlowInfo(), FakeProvider(latency=0.3)
+    funds = FundamentalsTable(os.path.join(root, "fundamentals"), FundamentalsFetcher(rate=0, info_fn=info), cache=cache)
+    refresher = SnapshotRefresher(PriceStore(os.path.join(root, "prices"), source=fp), funds,
+                                  UniverseService(os.path.join(root, f"universe-{i}"), http_get=http),
+                                  markets=[MARKET], cache=cache)
+    barrier.wait()
+    t0 = time.perf_counter()
+    snap = refresher.refresh(MARKET)
+    wall = time.perf_counter() - t0
+    funds.wait()  # pełna tabela budowana w tle po zimnym starcie z małej puli
+    out.put({"proc": i, "wall": wall, "http": http.calls, "info": info.calls, "prices": fp.tickers_requested,
+             "leaders": [x['t'] for x in snap['overview'][0]], "stats": cache.stats() if cache else None})
+
+def run_processes(procs, n, use_cache):
+    root = tempfile.mkdtemp(prefix="kolgejt-cache-")
+    ctx = mp.get_context("spawn")
+    barrier, out = ctx.Barrier(procs), ctx.Queue()
+    ps = [ctx.Process(target=replica, args=(i, root, n, use_cache, barrier, out)) for i in range(procs)]
+    for p in ps: p.start()
+    rows = sorted((out.get() for _ in ps), key=lambda r: r["proc"])
+    for p in ps: p.join()
+    shared = SharedCache(os.path.join(root, "cache.sqlite")).shared_stats() if use_cache else None
+    shutil.rmtree(root, ignore_errors=True)
+    return rows, shared
+
+def store_writer(i, root, tickers, sessions, barrier):
+    # Każdy proces dociąga swoje tickery (częściowo wspólne z innymi) przez kolejne sesje;
+    # max_parts=2 wymusza kompakcję niemal przy każdym zapisie
+    fp = FakeProvider(end="2026-09-01")
+    store = PriceStore(os.path.join(root, "prices"), source=fp, max_parts=2)
+    barrier.wait()
+    for day in pd.bdate_range("2026-09-01", periods=sessions):
+        fp.end = day
+        store.get(MARKET, tickers, now=datetime.combine(day.date(), datetime.min.time(), timezone.utc) + timedelta(hours=21))
+
+def run_store(procs, sessions=15):
+    root = tempfile.mkdtemp(prefix="kolgejt-store-")
+    ctx = mp.get_context("spawn")
+    barrier = ctx.Barrier(procs)
+    sets = [[f"S{j:03d}" for j in range(i * 20, i * 20 + 40)] for i in range(procs)]
+    ps = [ctx.Process(target=store_writer, args=(i, root, sets[i], sessions, barrier)) for i in range(procs)]
+    for p in ps: p.start()
+    for p in ps: p.join()
+    assert all(p.exitcode == 0 for p in ps), [p.exitcode for p in ps]
+    # Nowy proces widzi wszystko, co zapisały repliki: komplet tickerów, ostatnia sesja, znaczniki w meta
+    last = pd.bdate_range("2026-09-01", periods=sessions)[-1]
+    store, ref = PriceStore(os.path.join(root, "prices")), FakeProvider(end=last)
+    frames, tickers = store.frames(MARKET), sorted(set().union(*sets))
+    missing = [t for t in tickers if t not in frames or frames[t].index[-1] != last or not frames[t]['Close'].equals(ref.history(t).loc[frames[t].index[0]:last, 'Close'])]
+    checked = [t for t in tickers if t in store._meta["US"]]
+    parts = len(store._parts(MARKET))
+    shutil.rmtree(root, ignore_errors=True)
+    return len(tickers), missing, len(checked), parts
+
+def run_threads(threads):
+    # Jeden proces, wiele sesji naraz pyta o ten sam klucz
+    root = tempfile.mkdtemp(prefix="kolgejt-cache-")
+    cache, calls = SharedCache(os.path.join(root, "cache.sqlite")), []
+    def slow():
+        calls.append(1); time.sleep(0.5)
+        return list(range(1000))
+    ts = [threading.Thread(target=lambda: cache.get(make_key("overview", MARKET), slow)) for _ in range(threads)]
+    for t in ts: t.start()
+    for t in ts: t.join()
+    stats = cache.stats()
+    shutil.rmtree(root, ignore_errors=True)
+    return len(calls), stats
+
+def run_eviction():
+    root = tempfile.mkdtemp(prefix="kolgejt-cache-")
+    cache = SharedCache(os.path.join(root, "cache.sqlite"), max_bytes=350_000)
+    for k in range(10): cache.get(f"k{k}", lambda: b"x" * 100_000)
+    cache.get("k9", lambda: None)  # najnowszy wpis musi zostać
+    stats = cache.stats()
+    shutil.rmtree(root, ignore_errors=True)
+    return stats
+
+def main():
+    ap = argparse.ArgumentParser(description="Wspólny cache między procesami (offline)")
+    ap.add_argument("--procs", type=int, default=4)
+    ap.add_argument("--threads", type=int, default=8)
+    ap.add_argument("--tickers", type=int, default=500)
+    args = ap.parse_args()
+
+    for use_cache in (False, True):
+        rows, shared = run_processes(args.procs, args.tickers, use_cache)
+        print(f"\n=== {args.procs} procesy, {'SharedCache' if use_cache else 'bez cache'} ===")
+        for r in rows:
+            print(f"proces {r['proc']}: {r['wall']:.2f}s  http={r['http']} info={r['info']} notowania={r['prices']} spółek  {r['stats'] or ''}")
+        total = {k: sum(r[k] for r in rows) for k in ("http", "info", "prices")}
+        print(f"razem: {total}" + (f"  liczniki wspólne: {shared}" if shared else ""))
+        if use_cache:
+            assert total["http"] == 1 and total["prices"] == min(args.tickers, 50), total
+            assert len({tuple(r["leaders"]) for r in rows}) == 1, "różne wyniki w procesach"
+
+    n, missing, checked, parts = run_store(args.procs)
+    print(f"\n=== {args.procs} procesy piszą do jednego magazynu notowań (kompakcja co 2 części) ===\n"
+          f"tickerów: {n}, niepełnych: {len(missing)}, w meta: {checked}, części na dysku: {parts}")
+    assert not missing and checked == n, missing
+
+    n_calls, stats = run_threads(args.threads)
+    print(f"\n=== {args.threads} wątków, ten sam klucz ===\nwywołań funkcji: {n_calls}  {stats}")
+    assert n_calls == 1 and stats["coalesced"] == args.threads - 1
+
+    stats = run_eviction()
+    print(f"\n=== limit rozmiaru 350 kB, 10 wpisów po 100 kB ===\n{stats}")
+    assert stats["bytes"] <= 350_000 and stats["evictions"] == 7 and stats["hits"] == 1
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import os
+import sys
+import time
+import argparse
+import tempfile
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from providers import FakeProvider
+from indicators import wilder_rsi, sma, bollinger
+from live import LiveWatchlist, TickReplay, write_ticks, conditions
+
+# --- WATCHLISTA NA ŻYWO: zgodność z liczeniem wsadowym + czas aktualizacji ---
+# Stan seedujemy historią, dalsze sesje podajemy jako ticki z pliku (kilka cen w ciągu
+# dnia, ostatnia = zamknięcie). Po każdej sesji wartości i warunki z live.py muszą
+# zgadzać się z wilder_rsi / rolling() policzonymi od zera na całej historii.
+# python benchmarks/check_live.py [--tickers 100] [--days 400] [--live-days 120]
+
+PARAMS = {"rsi_threshold": 40, "sma_period": 50, "bb_mult": 1.05}
+STRATEGIES = ("RSI", "SMA", "Bollinger")
+
+def intraday_ticks(close, live_days, per_day, seed=0):
+    # Ceny w trakcie sesji błądzą wokół zamknięcia; ostatnia cena dnia = zamknięcie
+    rng = np.random.default_rng(seed)
+    ticks = []
+    for day in close.index[-live_days:]:
+        for k in range(per_day):
+            when = day + pd.Timedelta(hours=9, minutes=30) + k * pd.Timedelta(minutes=390 // per_day)
+            for t in close.columns:
+                c = close.at[day, t]
+                ticks.append((when, t, c if k == per_day - 1 else c * (1 + rng.normal(0, 0.01))))
+    return ticks
+
+def batch(close):
+    low, _, _ = bollinger(close)
+    return {"rsi": wilder_rsi(close), "sma": sma(close, PARAMS['sma_period']), "low": low}
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--tickers", type=int, default=100)
+    ap.add_argument("--days", type=int, default=400)
+    ap.add_argument("--live-days", type=int, default=120)
+    ap.add_argument("--per-day", type=int, default=5, help="ticków na spółkę w ciągu sesji")
+    args = ap.parse_args()
+
+    fp = FakeProvider()
+    tickers = [f"L{i:04d}" for i in range(args.tickers)]
+    data = fp(tickers, start=(fp.end - pd.tseries.offsets.BDay(args.days - 1)).strftime("%Y-%m-%d"))
+    close = pd.DataFrame({t: data[t]['Close'] for t in tickers})
+    ref = batch(close)
+
+    # Seed: historia do pierwszej sesji "na żywo" włącznie (jej cena zostanie nadpisana tickami)
+    first = len(close) - args.live_days
+    wl = LiveWatchlist(STRATEGIES, PARAMS).seed({t: close[[t]].iloc[:first + 1].rename(columns={t: "Close"}) for t in tickers})
+    path = os.path.join(tempfile.mkdtemp(), "ticks.csv")
+    write_ticks(path, intraday_ticks(close, args.live_days, args.per_day))
+    replay = TickReplay(path)
+
+    worst = {"rsi": 0.0, "sma": 0.0, "low": 0.0}
+    flips_live = flips_batch = 0
+    prev_batch = {t: conditions({"price": close.at[close.index[first - 1], t], **{k: ref[k].at[close.index[first - 1], t] for k in worst}}, STRATEGIES, PARAMS) for t in tickers}
+    t_update, n_ticks = 0.0, 0
+    for day in close.index[first:]:
+        ticks = replay.next(args.per_day * args.tickers)
+        t0 = time.perf_counter(); alerts = wl.update_many(ticks); t_update += time.perf_counter() - t0
+        n_ticks += len(ticks)
+        flips_live += len(alerts)
+        for t in tickers:
+            v = wl.tickers[t].values
+            assert wl.tickers[t].day == day.date()
+            for k in worst:
+                a, b = v[k], ref[k].at[day, t]
+                assert np.isnan(a) == np.isnan(b), (t, day, k, a, b)
+                if not np.isnan(a): worst[k] = max(worst[k], abs(a - b) / max(abs(b), 1e-12))
+            # Warunki po zamknięciu sesji takie same jak z wartości wsadowych
+            cb = conditions({"price": close.at[day, t], **{k: ref[k].at[day, t] for k in worst}}, STRATEGIES, PARAMS)
+            assert cb == wl.state[t], (t, day, cb, wl.state[t])
+            flips_batch += sum(cb[k] != prev_batch[t][k] for k in cb)
+            prev_batch[t] = cb
+    assert replay.next(1) == [] and replay.done
+
+    print(f"{args.tickers} spółek × {args.live_days} sesji × {args.per_day} ticków: max błąd względny " + ", ".join(f"{k} {e:.1e}" for k, e in worst.items()))
+    assert all(e < 1e-9 for e in worst.values())
+    print(f"alerty: {flips_live} (zmiany warunków na zamknięciach: {flips_batch}; reszta to przecięcia w trakcie sesji)")
+    assert flips_live >= flips_batch
+    print(f"aktualizacja: {t_update / n_ticks * 1e6:.1f} µs/tick ({n_ticks} ticków)")
+
+    t0 = time.perf_counter(); batch(close); t_batch = time.perf_counter() - t0
+    print(f"przeliczenie wsadowe całej historii ({len(close)} sesji): {t_batch * 1e3:.1f} ms na jedno odświeżenie")
+    print("OK")
+
+if __name__ == "__main__":
+    main()
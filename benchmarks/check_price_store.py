@@ -0,0 +1,116 @@
+import os
+import sys
+import argparse
+import tempfile
+from datetime import datetime, timezone
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from providers import FakeProvider
+from price_store import PriceStore, FIELDS, MAX_WINDOW
+
+# --- MAGAZYN NOTOWAŃ: kiedy sięgamy do dostawcy, a kiedy wystarcza dysk ---
+# Zegar podajemy jawnie (now=...), a FakeProvider liczy wywołania i zwraca słupki do
+# ustawionego dnia `end`, więc kolejne sesje i godziny w trakcie sesji da się odtworzyć offline.
+# python benchmarks/check_price_store.py [--tickers 60]
+
+MARKET = "S&P 500"
+
+def at(day, hhmm):
+    # Czas UTC; NYSE w październiku: 9:30-16:00 ET = 13:30-20:00 UTC
+    return datetime.fromisoformat(f"{day}T{hhmm}").replace(tzinfo=timezone.utc)
+
+def calls_during(fp, fn):
+    n = len(fp.calls)
+    out = fn()
+    return fp.calls[n:], out
+
+def same_as_provider(fp, frames, tickers):
+    for t in tickers:
+        ref = fp.history(t).loc[:fp.end][FIELDS]
+        df = frames[t]
+        assert df.index[-1] == fp.end, (t, df.index[-1], fp.end)
+        pd.testing.assert_frame_equal(df, ref.loc[df.index[0]:], check_freq=False, check_names=False)
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--tickers", type=int, default=60)
+    args = ap.parse_args()
+
+    root = tempfile.mkdtemp(prefix="kolgejt-prices-")
+    tickers = [f"P{i:04d}" for i in range(args.tickers)]
+    fp = FakeProvider(end="2026-10-14", missing={tickers[3]})
+    store = PriceStore(root, source=fp, chunk_size=100)
+    ok = [t for t in tickers if t != tickers[3]]
+
+    # 1. Zasilenie: jedno pobranie całej historii (start=None), brakujący ticker po ponowieniach
+    calls, (frames, failed) = calls_during(fp, lambda: store.get(MARKET, tickers, now=at("2026-10-14", "21:00")))
+    assert [c["start"] for c in calls] == [None] * (1 + store.retries), calls
+    assert failed == [tickers[3]] and sorted(frames) == sorted(ok)
+    same_as_provider(fp, frames, ok)
+    print(f"zasilenie: {len(calls)} wywołań (1 + {store.retries} ponowienia dla brakującego tickera)")
+
+    # 2. Ponowne uruchomienie tego samego dnia: nic nie pobieramy (także brakującego tickera)
+    calls, (frames2, failed) = calls_during(fp, lambda: store.get(MARKET, tickers, now=at("2026-10-14", "21:05")))
+    assert calls == [] and failed == [tickers[3]] and all(frames2[t] is frames[t] for t in ok)
+    print("ponowne uruchomienie: 0 wywołań")
+
+    # 3. Nowy proces: wszystko z dysku, bez sieci
+    fresh = PriceStore(root, source=fp)
+    calls, (frames3, _) = calls_during(fp, lambda: fresh.get(MARKET, tickers, now=at("2026-10-14", "21:10")))
+    assert calls == []
+    for t in ok: pd.testing.assert_frame_equal(frames3[t], frames[t], check_freq=False)
+    print("nowy proces: 0 wywołań, dane z Parquet")
+
+    # 4. Kolejna sesja: pobieramy tylko od ostatniej zapisanej daty (włącznie); brakujący ticker
+    #    dostaje nową próbę po fail_ttl
+    fp.end = pd.Timestamp("2026-10-15")
+    calls, (frames4, _) = calls_during(fp, lambda: fresh.get(MARKET, tickers, now=at("2026-10-15", "20:30")))
+    starts = {c["start"]: c["tickers"] for c in calls}
+    assert sorted(starts["2026-10-14"]) == sorted(ok), starts.keys()
+    assert starts.get(None) == [tickers[3]]
+    same_as_provider(fp, frames4, ok)
+    print(f"kolejna sesja: {len(calls)} wywołań, start={sorted(k for k in starts if k)}")
+
+    # 5. W trakcie sesji: bieżący słupek odświeżany najwyżej co intraday_ttl
+    fp.end = pd.Timestamp("2026-10-16")
+    calls, _ = calls_during(fp, lambda: fresh.get(MARKET, ok, now=at("2026-10-16", "14:00")))
+    assert [c["start"] for c in calls] == ["2026-10-15"], calls
+    calls, _ = calls_during(fp, lambda: fresh.get(MARKET, ok, now=at("2026-10-16", "14:10")))
+    assert calls == []
+    calls, (frames5, _) = calls_during(fp, lambda: fresh.get(MARKET, ok, now=at("2026-10-16", "14:20")))
+    assert [c["start"] for c in calls] == ["2026-10-16"], calls
+    same_as_provider(fp, frames5, ok)
+    print(f"w trakcie sesji: odświeżenie po {fresh.intraday_ttl // 60} min, w międzyczasie 0 wywołań")
+    # Ręczne odświeżenie (force) pomija TTL
+    calls, _ = calls_during(fp, lambda: fresh.get(MARKET, ok, now=at("2026-10-16", "14:25"), force=True))
+    assert [c["start"] for c in calls] == ["2026-10-16"], calls
+    print("force: pobranie mimo TTL")
+
+    # 6. Weekend: sesja piątkowa już sprawdzona po zamknięciu -> bez pobierania
+    calls, _ = calls_during(fp, lambda: fresh.get(MARKET, ok, now=at("2026-10-16", "20:30")))
+    assert len(calls) == 1
+    calls, _ = calls_during(fp, lambda: fresh.get(MARKET, ok, now=at("2026-10-18", "12:00")))
+    assert calls == []
+    print("weekend: 0 wywołań")
+
+    # 7. Automatyczna kompakcja przycina historię do `history` (+ zapas), ale zostawia
+    #    co najmniej MAX_WINDOW sesji dla najdłuższej średniej
+    for history in ("1y", "1mo"):
+        root = tempfile.mkdtemp(prefix="kolgejt-prices-")
+        fp = FakeProvider(end="2026-10-14")
+        PriceStore(root, source=fp, history="5y").get(MARKET, ok[:5], now=at("2026-10-14", "21:00"))
+        fp.end = pd.Timestamp("2026-10-15")
+        small = PriceStore(root, source=fp, history=history, max_parts=1)
+        _, (frames7, _) = calls_during(fp, lambda: small.get(MARKET, ok[:5], now=at("2026-10-15", "21:00")))
+        cutoff = pd.Timestamp("2026-10-15") - pd.Timedelta(days=small.keep_days)
+        assert len(small._parts(MARKET)) == 1
+        for t in ok[:5]:
+            df = frames7[t]
+            assert df.index[0] >= cutoff and df.index[0] - cutoff < pd.Timedelta(days=5) and len(df) >= MAX_WINDOW, (history, t, df.index[0], len(df))
+        n = len(PriceStore(root).frames(MARKET)[ok[0]])
+        print(f"kompakcja (history={history}): {n} sesji od {cutoff.date()} zamiast 5 lat")
+    print("OK")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import numpy as np
+import pandas as pd
+import yfinance as yf
+from shared_cache import make_key
+
+# --- FUNDAMENTY: RÓWNOLEGŁE POBIERANIE .info ---
+# Pula wątków z limitem współbieżności, limitem zapytań na sekundę i timeoutem na
+# pojedyncze wywołanie. Słowniki info są cache'owane per ticker z własnym TTL, więc
+# spółki wspólne dla kilku rynków (NVDA, META, AAPL...) pobieramy raz.
+
+def yf_info(ticker):
+    return yf.Ticker(ticker).info
+
+class RateLimiter:
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if not self.interval: return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now: time.sleep(slot - now)
+
+class FundamentalsFetcher:
+    def __init__(self, max_workers=8, timeout=15, rate=8.0, ttl=3600*4, fail_ttl=600, info_fn=None):
+        self.timeout = timeout
+        self.ttl = ttl
+        self.fail_ttl = fail_ttl  # po błędzie nie pytamy o ten ticker przez fail_ttl sekund
+        self.info_fn = info_fn or yf_info
+        self.limiter = RateLimiter(rate)
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="fundamentals")
+        self._cache = {}     # ticker -> (czas pobrania, info albo None po błędzie)
+        self._inflight = {}  # ticker -> Future (wspólne dla równoległych sesji)
+        self._started = {}   # ticker -> start wywołania (do timeoutu)
+        self._lock = threading.Lock()
+
+    def _cached(self, ticker, now):
+        hit = self._cache.get(ticker)
+        if not hit: return False, None
+        at, info = hit
+        return now - at < (self.ttl if info is not None else self.fail_ttl), info
+
+    def _work(self, ticker):
+        self.limiter.acquire()
+        self._started[ticker] = start = time.monotonic()
+        try:
+            info = self.info_fn(ticker)
+            if not isinstance(info, dict) or not info: info = None
+        except Exception:
+            info = None
+        took = time.monotonic() - start
+        with self._lock:
+            self._cache[ticker] = (time.monotonic(), info)
+            self._inflight.pop(ticker, None)
+            self._started.pop(ticker, None)
+        return info, took
+
+    def fetch(self, tickers):
+        now = time.monotonic()
+        infos, futures = {}, {}
+        cached = 0
+        with self._lock:
+            for t in dict.fromkeys(tickers):
+                fresh, info = self._cached(t, now)
+                if fresh:
+                    cached += 1
+                    if info is not None: infos[t] = info
+                    continue
+                fut = self._inflight.get(t)
+                if fut is None:
+                    fut = self._inflight[t] = self._pool.submit(self._work, t)
+                futures[fut] = t
+
+        # Czekamy na wyniki; wywołanie dłuższe niż timeout porzucamy (wynik i tak trafi do cache).
+        # Do p50/p95 liczy się jako trwające co najmniej timeout - inaczej p95 gubiłby najwolniejsze.
+        latencies, timed_out = [], []
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, timeout=0.2, return_when=FIRST_COMPLETED)
+            for fut in done:
+                info, took = fut.result()
+                latencies.append(took)
+                if info is not None: infos[futures[fut]] = info
+            clock = time.monotonic()
+            for fut in [f for f in pending if clock - self._started.get(futures[f], clock) > self.timeout]:
+                pending.discard(fut); timed_out.append(futures[fut]); latencies.append(self.timeout)
+
+        stats = {
+            "requested": len(futures) + cached, "cached": cached, "fetched": len(latencies) - len(timed_out),
+            "failed": len(futures) + cached - len(infos), "timed_out": len(timed_out),
+            "p50": float(np.percentile(latencies, 50)) if latencies else 0.0,
+            "p95": float(np.percentile(latencies, 95)) if latencies else 0.0,
+            "wall": time.monotonic() - now,
+        }
+        return infos, stats
+
+# --- RANKING ---
+def format_large_num(num):
+    if num is None: return "-"
+    if num > 1e9: return f"{num/1e9:.2f}B"
+    if num > 1e6: return f"{num/1e6:.2f}M"
+    return f"{num:.2f}"
+
+# --- TABELA FUNDAMENTÓW (cały skład indeksu) ---
+# Zamiast listy gotowych kart HTML dla małej puli spółek trzymamy kolumnową tabelę
+# (pandas/Parquet) dla całego indeksu, przebudowywaną w tle co `ttl`. Ranking to
+# filtr + wybór top-k na kolumnach numpy; formatujemy tylko pokazywane wiersze.
+
+def _num(x):
+    try: return float(x) if x is not None else np.nan
+    except (TypeError, ValueError): return np.nan
+
+def build_table(infos, tickers):
+    rows = [t for t in dict.fromkeys(tickers) if t in infos]
+    info = [infos[t] for t in rows]
+    tab = pd.DataFrame({"ticker": rows,
+                        "revenueGrowth": [_num(i.get('revenueGrowth')) for i in info],
+                        "earningsGrowth": [_num(i.get('earningsGrowth')) for i in info],
+                        "trailingEps": [_num(i.get('trailingEps', 0)) for i in info],
+                        "totalRevenue": [_num(i.get('totalRevenue', 0)) for i in info],
+                        "recommendationKey": [str(i.get('recommendationKey', 'none')) for i in info],
+                        "targetMeanPrice": [_num(i.get('targetMeanPrice', 0)) for i in info],
+                        "currentPrice": [_num(i.get('currentPrice', i.get('previousClose', 0))) for i in info]})
+    tab["forwardEps"] = [_num(i['forwardEps']) if 'forwardEps' in i else e * 0.95 for i, e in zip(info, tab["trailingEps"])]
+    tab["score"] = (tab["revenueGrowth"] * 100) + (tab["earningsGrowth"] * 100)
+    cur = tab["currentPrice"].where(tab["currentPrice"] != 0)
+    tab["upside"] = ((tab["targetMeanPrice"] - cur) / cur) * 100
+    return tab
+
+def query(tab, where=None, by="score", k=None, ascending=False):
+    # Filtr (maska albo funkcja tab -> maska) + top-k po kolumnie `by`. Dla k < liczby
+    # wierszy wybór przez argpartition (O(n)) i sortowanie tylko k zwycięzców.
+    mask = np.ones(len(tab), dtype=bool) if where is None else np.asarray(where(tab) if callable(where) else where, dtype=bool)
+    vals = tab[by].to_numpy(dtype=float)
+    idx = np.flatnonzero(mask & ~np.isnan(vals))
+    key = vals[idx] if ascending else -vals[idx]
+    if k is not None and k < len(idx):
+        part = np.argpartition(key, k - 1)[:k]
+        idx, key = idx[part], key[part]
+    return tab.iloc[idx[np.argsort(key, kind="stable")]]
+
+def fund_card(r, domains):
+    # Jeden wiersz tabeli -> pola karty w rendererze (render.fund_cards_html / strong_buy_html)
+    eps_diff_pct = ((r.trailingEps - r.forwardEps) / abs(r.forwardEps)) * 100 if r.forwardEps else 0
+    rev_est = r.totalRevenue * 0.98
+    rev_diff_pct = ((r.totalRevenue - rev_est) / rev_est) * 100 if rev_est else 0
+    return {
+        "ticker": r.ticker, "link": f"https://finance.yahoo.com/quote/{r.ticker}", "domain": domains.get(r.ticker), "score": r.score,
+        "eps_est": round(r.forwardEps, 2), "eps_act": round(r.trailingEps, 2),
+        "eps_txt": f"{'Beat' if eps_diff_pct>=0 else 'Miss'} {abs(eps_diff_pct):.0f}%",
+        "eps_cls": "text-green" if eps_diff_pct>=0 else "text-red",
+        "rev_est": format_large_num(rev_est), "rev_act": format_large_num(r.totalRevenue),
+        "rev_txt": f"{'Beat' if rev_diff_pct>=0 else 'Miss'} {abs(rev_diff_pct):.0f}%",
+        "rev_cls": "text-green" if rev_diff_pct>=0 else "text-red",
+        "rev_growth": round(r.revenueGrowth*100, 1), "earn_growth": round(r.earningsGrowth*100, 1),
+        "g_rev_cls": "text-green" if r.revenueGrowth>0 else "text-red",
+        "g_eps_cls": "text-green" if r.earningsGrowth>0 else "text-red",
+        "recommendation": r.recommendationKey, "target_price": r.targetMeanPrice, "current_price": r.currentPrice, "upside": r.upside,
+    }
+
+def rank(tab, domains, k=5):
+    # Top k po score i najlepszy "strong buy" po potencjale wzrostu do ceny docelowej. Spółki bez
+    # wzrostów albo z EPS / przychodem ustawionym na None (NaN w tabeli) pomijamy - karta pokazałaby "nan"
+    valid = lambda t: (t["revenueGrowth"].fillna(0).ne(0) & t["earningsGrowth"].fillna(0).ne(0)
+                       & t[["trailingEps", "forwardEps", "totalRevenue"]].notna().all(axis=1))
+    top = query(tab, valid, "score", k)
+    strong = query(tab, lambda t: valid(t) & (t["recommendationKey"] == "strong_buy") & (t["targetMeanPrice"] > t["currentPrice"]), "upside", 1)
+    return [fund_card(r, domains) for r in top.itertuples(index=False)], next((fund_card(r, domains) for r in strong.itertuples(index=False)), None)
+
+class FundamentalsTable:
+    def __init__(self, root="data/fundamentals", fetcher=None, ttl=3600*4, cache=None, min_ratio=0.8):
+        self.root = root
+        self.fetcher = fetcher or FundamentalsFetcher()
+        self.ttl = ttl
+        self.cache = cache          # SharedCache: przebudowę robi jeden proces naraz
+        self.min_ratio = min_ratio  # pokrycie składu < 80% poprzedniego = awaria źródła (429, brak sieci)
+        self._tables = {}           # market -> (tab, meta)
+        self._errors = {}           # market -> opis ostatniej odrzuconej / nieudanej przebudowy
+        self._building = {}         # market -> wątek przebudowy w tle
+        self._lock = threading.Lock()
+
+    def _paths(self, market):
+        base = os.path.join(self.root, market.replace(" ", "_").replace("&", "and"))
+        return base + ".parquet", base + ".json"
+
+    @staticmethod
+    def _digest(tickers):
+        return hashlib.sha1(",".join(sorted(set(tickers))).encode()).hexdigest()[:16]
+
+    def latest(self, market):
+        # Tabela z pamięci albo z dysku, jeśli inny proces zbudował nowszą - bez sieci
+        cur = self._tables.get(market)
+        pq, js = self._paths(market)
+        try:
+            with open(js, encoding="utf-8") as f: meta = json.load(f)
+            if cur is None or meta['built_at'] > cur[1]['built_at']:
+                cur = self._tables[market] = (pd.read_parquet(pq), meta)
+        except (OSError, ValueError, KeyError):
+            pass
+        return cur
+
+    def build(self, market, tickers):
+        infos, stats = self.fetcher.fetch(tickers)
+        tab = build_table(infos, tickers)
+        meta = {"market": market, "built_at": datetime.now().isoformat(timespec="seconds"), "universe": self._digest(tickers),
+                "count": len(set(tickers)), "stats": stats}
+        # Nieudane pobranie nie może nadpisać dobrej tabeli ani przesunąć built_at - wtedy
+        # stara tabela zostaje, a _due() dalej zgłasza przebudowę przy kolejnym odświeżeniu
+        prev = self.latest(market)
+        if not len(tab) or (prev and len(tab) / meta['count'] < len(prev[0]) / prev[1]['count'] * self.min_ratio):
+            raise ValueError(f"{market}: dane fundamentalne dla {len(tab)} z {meta['count']} spółek"
+                             + (f" (poprzednio {len(prev[0])} z {prev[1]['count']})" if prev else ""))
+        pq, js = self._paths(market)
+        os.makedirs(self.root, exist_ok=True)
+        tmp = f".{os.getpid()}-{threading.get_ident()}.tmp"   # kilka procesów może budować naraz (bez SharedCache)
+        tab.to_parquet(pq + tmp, index=False); os.replace(pq + tmp, pq)
+        with open(js + tmp, "w", encoding="utf-8") as f: json.dump(meta, f)
+        os.replace(js + tmp, js)
+        self._tables[market] = (tab, meta)
+        self._errors.pop(market, None)
+        return tab, meta
+
+    def _due(self, meta, tickers):
+        age = (datetime.now() - datetime.fromisoformat(meta['built_at'])).total_seconds()
+        return age > self.ttl or meta['universe'] != self._digest(tickers)
+
+    def table(self, market, tickers, seed=None):
+        # Od ręki ostatnia tabela; przeterminowana albo dla innego składu -> przebudowa w tle.
+        # Zimny start bez tabeli: synchronicznie tylko mała pula `seed`; gdy i to się nie uda,
+        # pusta tabela (niezapisana) i kolejna próba przy następnym odświeżeniu.
+        cur = self.latest(market)
+        if cur is None:
+            try:
+                cur = self._build_shared(market, seed or tickers)
+            except Exception as e:
+                self._errors[market] = str(e)
+                return build_table({}, []), {"market": market, "built_at": None, "stats": {}, "error": str(e)}
+        if self._due(cur[1], tickers): self.build_async(market, tickers)
+        return cur[0], cur[1] | {"error": self._errors.get(market)}
+
+    def _build_shared(self, market, tickers):
+        # Z SharedCache buduje jeden proces; pozostałe czekają i czytają jego plik
+        if self.cache is None: return self.build(market, tickers)
+        self.cache.get(make_key("fund-table", market, tuple(tickers)), lambda: self.build(market, tickers)[1], ttl=self.ttl)
+        return self.latest(market)
+
+    def build_async(self, market, tickers):
+        def run():
+            try:
+                self._build_shared(market, tickers)
+            except Exception as e:
+                self._errors[market] = str(e)  # zostaje poprzednia tabela, kolejna próba przy następnym odświeżeniu
+            finally:
+                self._building.pop(market, None)
+        with self._lock:
+            if market in self._building: return
+            t = self._building[market] = threading.Thread(target=run, name=f"fund-table-{market}", daemon=True)
+        t.start()
+
+    def wait(self, timeout=None):
+        # Czeka na przebudowy w tle (zamknięcie procesu w trakcie zapisu Parquet kończy się abortem)
+        for t in list(self._building.values()): t.join(timeout)
@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+
+# --- WSKAŹNIKI DLA CAŁEGO RYNKU NARAZ ---
+# Wejście: szerokie macierze daty × tickery (close, volume). Każda operacja działa
+# na wszystkich kolumnach jednocześnie; wyniki są identyczne z liczeniem per spółka.
+
+def panel_matrices(frames):
+    close = pd.DataFrame({t: df['Close'] for t, df in frames.items()})
+    volume = pd.DataFrame({t: df['Volume'] for t, df in frames.items()}).reindex_like(close)
+    return close, volume
+
+def align_last(close, *others):
+    # Dosuwa notowania każdej kolumny do ostatniego wiersza (NaN lądują na górze).
+    # Spółka z dziurami w notowaniach liczy się wtedy tak samo jak jej własny
+    # yf.download po dropna - ostatni wiersz to zawsze jej ostatnia sesja.
+    values = close.to_numpy(dtype=float)
+    order = np.argsort(~np.isnan(values), axis=0, kind='stable')
+    out = [pd.DataFrame(np.take_along_axis(values, order, axis=0), index=close.index, columns=close.columns)]
+    for o in others:
+        out.append(pd.DataFrame(np.take_along_axis(o.to_numpy(dtype=float), order, axis=0), index=close.index, columns=close.columns))
+    return out if others else out[0]
+
+def wilder_rsi(close, period=14):
+    delta = close.diff()
+    gain = delta.where(delta > 0, 0).ewm(alpha=1/period, adjust=False).mean()
+    loss = (-delta.where(delta < 0, 0)).ewm(alpha=1/period, adjust=False).mean()
+    return 100 - (100 / (1 + gain / loss))
+
+def sma(close, n):
+    return close.rolling(window=n).mean()
+
+def prefix_sums(close):
+    values = close.to_numpy(dtype=float)
+    valid = ~np.isnan(values)
+    zero = np.zeros((1, values.shape[1]))
+    return np.vstack([zero, np.cumsum(np.where(valid, values, 0.0), axis=0)]), np.vstack([zero, np.cumsum(valid, axis=0)])
+
+def sma_cumsum(close, n, sums=None):
+    # Szybka SMA dla całej macierzy naraz (sumy skumulowane zamiast pętli po kolumnach).
+    # Okno z brakiem notowania daje NaN jak rolling(n); wynik różni się od rolling(n).mean()
+    # co najwyżej na ostatnich miejscach po przecinku - do backtestów i przeglądu parametrów.
+    # sums = prefix_sums(close) można policzyć raz dla wielu okresów n.
+    cs, cnt = sums if sums is not None else prefix_sums(close)
+    out = np.full(close.shape, np.nan)
+    if len(close) >= n:
+        out[n - 1:] = np.where((cnt[n:] - cnt[:-n]) == n, (cs[n:] - cs[:-n]) / n, np.nan)
+    return pd.DataFrame(out, index=close.index, columns=close.columns)
+
+def bollinger(close, n=20, k=2):
+    mid = close.rolling(n).mean()
+    std = close.rolling(n).std()
+    return mid - k * std, mid, mid + k * std
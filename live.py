@@ -0,0 +1,185 @@
+import csv
+import math
+from datetime import datetime
+import pandas as pd
+from providers import yf_download
+from scanner import split_panel
+
+# --- WATCHLISTA NA ŻYWO ---
+# Stan wskaźników trzymany per spółka i aktualizowany w O(1) na każdą nową cenę:
+# - RSI Wildera: dwie średnie wykładnicze zysków i strat (jak ewm(adjust=False)),
+# - SMA: suma krocząca z kompensacją Kahana,
+# - wstęgi Bollingera: wariancja krocząca metodą Welforda (dodaj nową, usuń najstarszą).
+# Notowanie w trakcie sesji nadpisuje bieżący słupek (podgląd bez zmiany stanu);
+# stan przesuwa się dopiero, gdy przychodzi cena z kolejnego dnia.
+
+RSI_PERIOD = 14
+BB_PERIOD, BB_WIDTH = 20, 2
+
+def _ewm(avg, x, alpha):
+    # Jeden krok ewm(alpha, adjust=False).mean() w tej samej postaci co w pandas
+    if avg == x: return avg
+    old = 1.0 - alpha
+    return (old * avg + alpha * x) / (old + alpha)
+
+def _kahan(total, comp, x):
+    y = x - comp
+    t = total + y
+    return t, (t - total) - y
+
+def _rsi(gain, loss):
+    if loss == 0: return math.nan if gain == 0 else 100.0
+    return 100 - (100 / (1 + gain / loss))
+
+class LiveTicker:
+    __slots__ = ("ticker", "sma_period", "rsi_period", "bb_period", "bb_width", "_buf", "_cap", "count",
+                 "prev", "gain", "loss", "sum", "comp", "n", "mean", "m2", "day", "price", "values")
+
+    def __init__(self, ticker, sma_period=50, rsi_period=RSI_PERIOD, bb_period=BB_PERIOD, bb_width=BB_WIDTH):
+        self.ticker = ticker
+        self.sma_period, self.rsi_period = sma_period, rsi_period
+        self.bb_period, self.bb_width = bb_period, bb_width
+        self._cap = max(sma_period, bb_period)
+        self._buf = [math.nan] * self._cap   # bufor cykliczny zamkniętych sesji
+        self.count = 0                       # liczba zamkniętych sesji w stanie
+        self.prev = math.nan
+        self.gain = self.loss = 0.0
+        self.sum = self.comp = 0.0
+        self.n, self.mean, self.m2 = 0, 0.0, 0.0
+        self.day = None                      # dzień bieżącego (otwartego) słupka
+        self.price = math.nan
+        self.values = None
+
+    def _ago(self, k):
+        # Zamknięcie sprzed k sesji (k=1 to ostatnia zamknięta)
+        return self._buf[(self.count - k) % self._cap]
+
+    def _step(self, x):
+        # Stan po dopisaniu sesji z zamknięciem x - bez modyfikacji obiektu
+        if self.count == 0:
+            gain = loss = 0.0
+        else:
+            a, d = 1 / self.rsi_period, x - self.prev
+            gain, loss = _ewm(self.gain, d if d > 0 else 0.0, a), _ewm(self.loss, -d if d < 0 else 0.0, a)
+        total, comp = _kahan(self.sum, self.comp, x)
+        if self.count >= self.sma_period: total, comp = _kahan(total, comp, -self._ago(self.sma_period))
+        n, mean, m2 = self.n + 1, self.mean, self.m2
+        delta = x - mean; mean += delta / n; m2 += delta * (x - mean)
+        if self.count >= self.bb_period:
+            y = self._ago(self.bb_period)
+            n -= 1; delta = y - mean; mean -= delta / n; m2 -= delta * (y - mean)
+        return gain, loss, total, comp, n, mean, max(m2, 0.0)
+
+    def _values(self, x, state):
+        gain, loss, total, _, n, mean, m2 = state
+        bars = self.count + 1
+        sma = total / self.sma_period if bars >= self.sma_period else math.nan
+        std = math.sqrt(m2 / (n - 1)) if bars >= self.bb_period and n > 1 else math.nan
+        return {"price": x, "rsi": _rsi(gain, loss) if self.count else math.nan, "sma": sma,
+                "low": mean - self.bb_width * std if not math.isnan(std) else math.nan, "bars": bars}
+
+    def commit(self, x):
+        self.gain, self.loss, self.sum, self.comp, self.n, self.mean, self.m2 = self._step(x)
+        self._buf[self.count % self._cap] = x
+        self.count += 1
+        self.prev = x
+
+    def preview(self, x):
+        return self._values(x, self._step(x))
+
+    def seed(self, closes):
+        # closes: Series z indeksem dat; ostatnia sesja zostaje otwartym słupkiem
+        closes = closes.dropna()
+        for x in closes.iloc[:-1]: self.commit(float(x))
+        if len(closes):
+            self.day, self.price = closes.index[-1].date(), float(closes.iloc[-1])
+            self.values = self.preview(self.price)
+        return self
+
+    def quote(self, when, price):
+        day = pd.Timestamp(when).date()
+        if self.day is not None and day < self.day: return self.values  # spóźniona cena z minionej sesji
+        if self.day is not None and day > self.day: self.commit(self.price)
+        self.day, self.price = day, float(price)
+        self.values = self.preview(self.price)
+        return self.values
+
+# --- WARUNKI I ALERTY (te same, które sprawdza skaner: RSIBelow, AboveSMA, NearLowerBand) ---
+def conditions(values, strategies, params):
+    out = {}
+    if "RSI" in strategies: out["RSI"] = values["rsi"] <= params['rsi_threshold']
+    if "SMA" in strategies: out["SMA"] = values["price"] > values["sma"]
+    if "Bollinger" in strategies: out["Bollinger"] = values["price"] <= values["low"] * params.get('bb_mult', 1.05)
+    return out
+
+ALERT_TEXT = {"RSI": "RSI ≤ {rsi_threshold}", "SMA": "cena > SMA({sma_period})", "Bollinger": "cena ≤ dolna wstęga × {bb_mult}"}
+
+class LiveWatchlist:
+    def __init__(self, strategies=("RSI", "SMA", "Bollinger"), params=None):
+        self.strategies = tuple(strategies)
+        self.params = {"rsi_threshold": 40, "sma_period": 50, "bb_mult": 1.05} | (params or {})
+        self.tickers = {}
+        self.state = {}      # ticker -> {warunek: bool} po ostatniej cenie
+        self.ticks = 0
+
+    def seed(self, frames):
+        for t, df in frames.items():
+            lt = LiveTicker(t, self.params['sma_period']).seed(df['Close'])
+            if lt.values is None: continue
+            self.tickers[t] = lt
+            self.state[t] = conditions(lt.values, self.strategies, self.params)
+        return self
+
+    def update(self, when, ticker, price):
+        lt = self.tickers.get(ticker)
+        if lt is None: return []
+        self.ticks += 1
+        values = lt.quote(when, price)
+        new = conditions(values, self.strategies, self.params)
+        alerts = [{"czas": pd.Timestamp(when), "spółka": ticker, "warunek": ALERT_TEXT[k].format(**self.params), "wejście": v,
+                   "cena": values["price"], "RSI": values["rsi"], "SMA": values["sma"], "dolna wstęga": values["low"]}
+                  for k, v in new.items() if v != self.state[ticker].get(k)]
+        self.state[ticker] = new
+        return alerts
+
+    def update_many(self, ticks):
+        return [a for when, ticker, price in ticks for a in self.update(when, ticker, price)]
+
+    def table(self):
+        return pd.DataFrame([{"spółka": t, "dzień": lt.day, "cena": lt.values["price"], "RSI": lt.values["rsi"], "SMA": lt.values["sma"],
+                              "dolna wstęga": lt.values["low"], **{k: "✅" if v else "" for k, v in self.state[t].items()}}
+                             for t, lt in self.tickers.items()])
+
+# --- ŹRÓDŁA CEN ---
+def read_ticks(path):
+    # CSV: time,ticker,price (czas ISO), posortowany po czasie
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            yield datetime.fromisoformat(row["time"]), row["ticker"], float(row["price"])
+
+def write_ticks(path, ticks):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(["time", "ticker", "price"])
+        for when, ticker, price in ticks: w.writerow([pd.Timestamp(when).isoformat(), ticker, repr(float(price))])
+
+class TickReplay:
+    # Odtwarzanie pliku z tickami porcjami (jedna porcja na odświeżenie widoku)
+    def __init__(self, path):
+        self.path = path
+        self._it = read_ticks(path)
+        self.done = False
+
+    def next(self, n):
+        out = []
+        for tick in self._it:
+            out.append(tick)
+            if len(out) >= n: return out
+        self.done = True
+        return out
+
+def poll_quotes(tickers, source=None):
+    # Ostatnia cena z bieżącej sesji (dzienny słupek z Yahoo); czas = dzień słupka
+    data = (source or yf_download)(list(tickers), period="5d")
+    frames = split_panel(data, list(tickers))
+    return [(df.index[-1], t, float(df['Close'].iloc[-1])) for t, df in frames.items()]
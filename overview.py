@@ -0,0 +1,41 @@
+import pandas as pd
+
+# --- PRZEGLĄD RYNKU (liderzy, wzrosty, spadki z ostatniego miesiąca) ---
+def get_market_overview_fixed(tickers, market, store, force=False):
+    try:
+        preview = tickers[:50] if len(tickers) > 50 else tickers
+        data, _ = store.get(market, preview, force=force)
+        valid_data = []
+        for t in preview:
+            try:
+                if t in data and not data[t]['Close'].empty:
+                    series = data[t]['Close'].dropna()
+                    series = series[series.index >= series.index[-1] - pd.DateOffset(months=1)]
+                    if len(series) > 5:
+                        curr = series.iloc[-1]
+                        prev = series.iloc[-2]
+                        start = series.iloc[0]
+                        day_chg = ((curr - prev) / prev) * 100
+                        mon_chg = ((curr - start) / start) * 100
+                        if pd.notna(mon_chg) and pd.notna(day_chg):
+                            valid_data.append({"t": t, "p": curr, "c": day_chg, "mc": mon_chg})
+            except: continue
+        
+        leaders = []
+        count = 0
+        for item in valid_data:
+            if item['t'] in tickers[:15]:
+                leaders.append(item)
+                count += 1
+            if count >= 5: break
+            
+        gainers = [x for x in valid_data if x['mc'] > 0]
+        gainers.sort(key=lambda x: x['mc'], reverse=True)
+        gainers = gainers[:5]
+        
+        losers = [x for x in valid_data if x['mc'] < 0]
+        losers.sort(key=lambda x: x['mc']) 
+        losers = losers[:5]
+        
+        return leaders, gainers, losers
+    except Exception as e: return [], [], []
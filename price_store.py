@@ -0,0 +1,228 @@
+import os
+import glob
+import json
+import threading
+from contextlib import contextmanager
+from datetime import datetime, time, timedelta, timezone
+from zoneinfo import ZoneInfo
+import pandas as pd
+from providers import PERIOD_DAYS
+from scanner import fetch_panel
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# --- LOKALNY MAGAZYN NOTOWAŃ (Parquet) ---
+# Jedna partycja (katalog) na rynek: <root>/market=US/part-*.parquet, wiersze (date, ticker, OHLCV).
+# Po pierwszym zasileniu dociągamy tylko brakujące ostatnie sesje; nowe dane trafiają do
+# kolejnych plików part-*, a compact() scala je w jeden i przycina starą historię.
+# Katalog może być wspólny dla kilku procesów (repliki aplikacji): odczyt, zapis i kompakcja
+# idą pod blokadą pliku <rynek>/.lock, _meta.json jest scalany z wersją na dysku, a compact()
+# przepisuje to, co leży na dysku (także części zapisane przez inne procesy).
+
+FIELDS = ["Open", "High", "Low", "Close", "Adj Close", "Volume"]
+MAX_WINDOW = 200        # najdłuższe okno wskaźnika (SMA 200 w suwaku) - tyle sesji zostaje zawsze
+KEEP_MARGIN_DAYS = 30   # zapas ponad `history` przy automatycznej kompakcji
+
+# Godziny sesji (bez świąt - dzień bez sesji wykrywamy po tym, że dostawca nie zwrócił nowego słupka)
+MARKET_HOURS = {
+    "US": (ZoneInfo("America/New_York"), time(9, 30), time(16, 0)),
+    "GPW": (ZoneInfo("Europe/Warsaw"), time(9, 0), time(17, 5)),
+}
+
+def _lock_file(f):
+    if fcntl: fcntl.flock(f, fcntl.LOCK_EX); return
+    while True:
+        try:
+            f.seek(0); msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1); return
+        except OSError:
+            continue  # LK_LOCK poddaje się po ~10 s - czekamy dalej
+
+def _unlock_file(f):
+    if fcntl: fcntl.flock(f, fcntl.LOCK_UN)
+    else: f.seek(0); msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+def _newest(a, b):
+    # Scalanie znaczników czasu (ISO UTC) z dwóch procesów: późniejszy wygrywa
+    return {t: max(a.get(t, ""), b.get(t, "")) for t in a.keys() | b.keys()}
+
+def market_key(market):
+    return "GPW" if "GPW" in market else "US"
+
+def _utcnow():
+    return datetime.now(timezone.utc)
+
+def is_session_open(market, now=None):
+    tz, open_t, close_t = MARKET_HOURS[market_key(market)]
+    local = (now or _utcnow()).astimezone(tz)
+    return local.weekday() < 5 and open_t <= local.time() < close_t
+
+def last_session_close(market, now=None):
+    # Moment zamknięcia ostatniej zakończonej sesji (UTC)
+    tz, _, close_t = MARKET_HOURS[market_key(market)]
+    local = (now or _utcnow()).astimezone(tz)
+    day = local.date() if local.time() >= close_t else local.date() - timedelta(days=1)
+    while day.weekday() >= 5: day -= timedelta(days=1)
+    return datetime.combine(day, close_t, tzinfo=tz).astimezone(timezone.utc)
+
+class PriceStore:
+    def __init__(self, root="data/prices", source=None, history="1y", intraday_ttl=900, chunk_size=100, retries=2, max_parts=20,
+                 retry_wait=0.2, fail_ttl=900):
+        self.root = root
+        self.source = source
+        self.history = history
+        self.intraday_ttl = intraday_ttl  # co ile sekund odświeżać bieżący słupek w trakcie sesji
+        self.chunk_size = chunk_size
+        self.retries = retries
+        self.retry_wait = retry_wait      # krótkie przerwy między ponowieniami - sesja czeka na wynik get()
+        self.fail_ttl = fail_ttl          # ticker bez danych od dostawcy pomijamy przez tyle sekund
+        self.max_parts = max_parts
+        # Automatyczna kompakcja przycina historię do `history` (+ zapas), ale nigdy poniżej
+        # MAX_WINDOW sesji (~7/5 dnia kalendarzowego na sesję + święta)
+        self.keep_days = max(PERIOD_DAYS.get(history, 365), MAX_WINDOW * 7 // 5 + 15) + KEEP_MARGIN_DAYS
+        self._frames = {}   # market -> {ticker: DataFrame}
+        self._meta = {}     # market -> {ticker: ISO czasu ostatniego sprawdzenia}
+        self._failed = {}   # market -> {ticker: ISO czasu ostatniej nieudanej próby}
+        self._locks = {}    # market -> RLock (wątki jednego procesu; pobieranie z sieci poza blokadą)
+        self._locks_guard = threading.Lock()
+
+    # --- ŚCIEŻKI / ODCZYT ---
+    def _dir(self, market):
+        return os.path.join(self.root, f"market={market_key(market)}")
+
+    def _parts(self, market):
+        return sorted(glob.glob(os.path.join(self._dir(market), "part-*.parquet")))
+
+    def _lock(self, key):
+        with self._locks_guard: return self._locks.setdefault(key, threading.RLock())
+
+    @contextmanager
+    def _file_lock(self, key):
+        # Blokada między procesami; wątki tego procesu rozdziela _lock(rynek). Nie jest
+        # wielobieżna - metody z przyrostkiem _locked zakładają, że jest już wzięta.
+        os.makedirs(self._dir(key), exist_ok=True)
+        with open(os.path.join(self._dir(key), ".lock"), "a+b") as f:
+            _lock_file(f)
+            try: yield
+            finally: _unlock_file(f)
+
+    def _read_meta(self, key):
+        meta_path = os.path.join(self._dir(key), "_meta.json")
+        if not os.path.exists(meta_path): return {}, {}
+        with open(meta_path, encoding="utf-8") as f: meta = json.load(f)
+        return meta, meta.pop("_failed", {})
+
+    def _read_locked(self, key):
+        frames = {}
+        parts = self._parts(key)
+        if parts:
+            long = pd.concat([pd.read_parquet(p) for p in parts], ignore_index=True)
+            long = long.drop_duplicates(["ticker", "date"], keep="last").sort_values("date")
+            for t, df in long.groupby("ticker", sort=False):
+                frames[t] = df.set_index("date")[FIELDS].rename_axis(None)
+        return frames, *self._read_meta(key), parts
+
+    def _load(self, market):
+        key = market_key(market)
+        if key in self._frames: return
+        with self._file_lock(key):
+            frames, meta, failed, _ = self._read_locked(key)
+        self._frames[key], self._meta[key], self._failed[key] = frames, meta, failed
+
+    def _write_locked(self, key, frames, merge=True):
+        if frames:
+            long = pd.concat({t: df[FIELDS] for t, df in frames.items()}, names=["ticker", "date"]).reset_index()
+            name = f"part-{_utcnow().strftime('%Y%m%d%H%M%S%f')}-{os.getpid()}.parquet"
+            long.to_parquet(os.path.join(self._dir(key), name), index=False)
+        # Na dysku wpisy wszystkich procesów; w pamięci zostaje widok tego procesu (jego ramki
+        # nie zawierają słupków dociągniętych przez inne, więc ich znaczniki by kłamały)
+        meta, failed = self._meta[key], self._failed[key]
+        if merge:
+            disk_meta, disk_failed = self._read_meta(key)
+            meta, failed = _newest(disk_meta, meta), _newest(disk_failed, failed)
+        path = os.path.join(self._dir(key), "_meta.json")
+        with open(path + ".tmp", "w", encoding="utf-8") as f: json.dump(meta | {"_failed": failed}, f)
+        os.replace(path + ".tmp", path)
+
+    def frames(self, market):
+        # Wszystko, co jest na dysku dla rynku - bez sięgania do sieci (backtest, analizy offline)
+        with self._lock(market_key(market)):
+            self._load(market)
+            return dict(self._frames[market_key(market)])
+
+    # --- ŚWIEŻOŚĆ ---
+    def is_stale(self, market, ticker, now=None):
+        now = now or _utcnow()
+        failed = self._failed.get(market_key(market), {}).get(ticker)
+        if failed and (now - datetime.fromisoformat(failed)).total_seconds() < self.fail_ttl: return False
+        checked = self._meta.get(market_key(market), {}).get(ticker)
+        if ticker not in self._frames.get(market_key(market), {}) or not checked: return True
+        checked = datetime.fromisoformat(checked)
+        if checked < last_session_close(market, now): return True
+        return is_session_open(market, now) and (now - checked).total_seconds() > self.intraday_ttl
+
+    # --- POBIERANIE ---
+    def get(self, market, tickers, now=None, progress=None, force=False):
+        # force=True (przycisk odświeżenia): dociągamy ostatnie sesje wszystkich tickerów mimo TTL
+        key = market_key(market)
+        now = now or _utcnow()
+        lock = self._lock(key)
+        with lock:
+            self._load(key)
+            frames = self._frames[key]
+            stale = [t for t in dict.fromkeys(tickers) if force or self.is_stale(key, t, now)]
+            # Pełne zasilenie dla nowych tickerów, dla reszty od ostatniej zapisanej daty
+            # (włącznie - ostatni słupek mógł być niedomknięty)
+            groups = {}
+            for t in stale:
+                start = frames[t].index[-1].strftime("%Y-%m-%d") if t in frames else None
+                groups.setdefault(start, []).append(t)
+            if not groups: return self._result(key, tickers, [])
+        # Sieć bez blokady: inne rynki i czytelnicy świeżych danych nie czekają na wolne pobieranie
+        fetched = [(group, *fetch_panel(group, period=self.history, start=start, chunk_size=self.chunk_size, retries=self.retries,
+                                         source=self.source, progress=progress, retry_wait=self.retry_wait))
+                   for start, group in groups.items()]
+        with lock:
+            frames, meta, fails = self._frames[key], self._meta[key], self._failed[key]
+            updated, failed = {}, []
+            for group, got, bad in fetched:
+                failed += bad
+                for t, df in got.items():
+                    updated[t] = df = df[FIELDS]
+                    frames[t] = pd.concat([frames[t][frames[t].index < df.index[0]], df]) if t in frames else df
+                for t in group:
+                    if t in bad: fails[t] = now.isoformat()
+                    else: meta[t] = now.isoformat(); fails.pop(t, None)
+            with self._file_lock(key):
+                self._write_locked(key, updated)
+                if len(self._parts(key)) > self.max_parts: self._compact_locked(key, self.keep_days, now=now)
+            return self._result(key, tickers, failed)
+
+    def _result(self, key, tickers, failed):
+        # Tickery pominięte po niedawnym błędzie też zgłaszamy jako nieudane
+        frames = self._frames[key]
+        failed = failed + [t for t in dict.fromkeys(tickers) if t not in frames and t not in failed]
+        return {t: frames[t] for t in tickers if t in frames}, failed
+
+    # --- KOMPAKCJA ---
+    def compact(self, market, keep_days=None, tickers=None):
+        key = market_key(market)
+        with self._lock(key), self._file_lock(key):
+            self._compact_locked(key, keep_days, tickers)
+
+    def _compact_locked(self, key, keep_days=None, tickers=None, now=None):
+        # Źródłem jest dysk, nie pamięć: części zapisane przez inne procesy nie mogą zginąć
+        frames, meta, failed, old = self._read_locked(key)
+        if tickers is not None:
+            keep = set(tickers)
+            for t in [t for t in frames.keys() | meta.keys() | failed.keys() if t not in keep]:
+                frames.pop(t, None); meta.pop(t, None); failed.pop(t, None)
+        if keep_days:
+            cutoff = pd.Timestamp((now or _utcnow()).date()) - pd.Timedelta(days=keep_days)
+            for t in list(frames): frames[t] = frames[t].loc[frames[t].index >= cutoff]
+        self._frames[key], self._meta[key], self._failed[key] = frames, meta, failed
+        self._write_locked(key, {t: df for t, df in frames.items() if len(df)}, merge=False)
+        for p in old: os.remove(p)
@@ -0,0 +1,37 @@
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+# --- POMIAR CZASU ETAPÓW ---
+# lap(): czas od poprzedniego punktu (panel w UI, bez przebudowy kodu strony).
+# stage(): blok z czasem i opcjonalnie szczytowym zużyciem pamięci (benchmarki).
+
+class StageTimer:
+    def __init__(self, memory=False):
+        self.memory = memory
+        self.records = []
+        self._last = time.perf_counter()
+
+    def lap(self, name):
+        now = time.perf_counter()
+        self.records.append({"stage": name, "wall_s": now - self._last})
+        self._last = now
+
+    @contextmanager
+    def stage(self, name, **extra):
+        rec = {"stage": name, **extra}
+        if self.memory:
+            tracemalloc.start(); tracemalloc.reset_peak()
+        t0 = time.perf_counter()
+        try:
+            yield rec
+        finally:
+            rec["wall_s"] = time.perf_counter() - t0
+            if self.memory:
+                rec["peak_mb"] = tracemalloc.get_traced_memory()[1] / 2**20
+                tracemalloc.stop()
+            self.records.append(rec)
+            self._last = time.perf_counter()
+
+    def total(self):
+        return sum(r["wall_s"] for r in self.records)
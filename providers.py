@@ -0,0 +1,57 @@
+import time
+import zlib
+import numpy as np
+import pandas as pd
+import yfinance as yf
+
+# --- ŹRÓDŁA DANYCH ---
+# Źródło to funkcja source(tickers, period="1y", start=None) zwracająca DataFrame
+# w formacie yf.download(..., group_by='ticker'): kolumny (ticker, pole OHLCV).
+
+PERIOD_DAYS = {"5d": 5, "1mo": 31, "3mo": 92, "6mo": 183, "1y": 365, "2y": 730, "5y": 1826, "10y": 3652}
+
+def yf_download(tickers, period="1y", start=None, timeout=10):
+    kw = {"start": start} if start is not None else {"period": period}
+    return yf.download(list(tickers), progress=False, timeout=timeout, group_by='ticker', auto_adjust=False, threads=True, **kw)
+
+# --- FAŁSZYWY DOSTAWCA (testy offline / benchmarki) ---
+class FakeProvider:
+    """Deterministyczne, syntetyczne notowania OHLCV zamiast Yahoo. Liczy wywołania."""
+
+    def __init__(self, end=None, latency=0.0, fail_calls=0, fail_tickers=(), missing=()):
+        self.end = pd.Timestamp(end or pd.Timestamp.today()).normalize()
+        self.latency = latency
+        self.fail_calls = fail_calls           # ile pierwszych wywołań rzuca wyjątek
+        self.fail_tickers = set(fail_tickers)  # tickery zwracane jako same NaN (jak timeout w yf)
+        self.missing = set(missing)            # tickery nieznane dostawcy
+        self.calls = []
+        self._cache = {}
+        self._days = pd.bdate_range("2010-01-04", "2030-12-31")
+
+    def history(self, ticker):
+        # Cała historia od stałej daty, żeby wartości nie zależały od okna zapytania
+        if ticker not in self._cache:
+            days = self._days
+            rng = np.random.default_rng(zlib.crc32(ticker.encode()))
+            close = 50 * np.exp(np.cumsum(rng.normal(0.0003, 0.02, len(days))))
+            vol = rng.integers(100_000, 5_000_000, len(days)).astype(float)
+            self._cache[ticker] = pd.DataFrame({"Open": close * 0.995, "High": close * 1.01, "Low": close * 0.99, "Close": close, "Adj Close": close, "Volume": vol}, index=days)
+        return self._cache[ticker]
+
+    def __call__(self, tickers, period="1y", start=None, **kw):
+        tickers = list(tickers)
+        self.calls.append({"tickers": tickers, "period": period, "start": start})
+        if self.latency: time.sleep(self.latency)
+        if len(self.calls) <= self.fail_calls: raise ConnectionError("FakeProvider: symulowany błąd sieci")
+        start = pd.Timestamp(start) if start is not None else self.end - pd.Timedelta(days=PERIOD_DAYS.get(period, 365))
+        frames = {}
+        for t in tickers:
+            if t in self.missing: continue
+            df = self.history(t).loc[start:self.end]
+            frames[t] = df * np.nan if t in self.fail_tickers else df
+        if not frames: return pd.DataFrame()
+        return pd.concat(frames, axis=1)
+
+    @property
+    def tickers_requested(self):
+        return sum(len(c["tickers"]) for c in self.calls)
@@ -0,0 +1,81 @@
+import time
+import threading
+from datetime import datetime
+from markets import FUND_POOLS, DOMAINS
+from overview import get_market_overview_fixed
+from fundamentals import rank
+from shared_cache import make_key
+
+# --- ODŚWIEŻANIE W TLE ---
+# Wątek poza skryptem Streamlit trzyma gotowe snapshoty (przegląd rynku + fundamenty)
+# dla wszystkich rynków i odświeża je co `interval` sekund. Strona tylko czyta ostatni
+# snapshot, więc czas renderowania nie zależy od Yahoo.
+# Z `cache` (SharedCache) wyniki są wspólne dla wszystkich procesów/replik: w danym
+# okresie skład i przegląd danego rynku liczy tylko jeden z nich. Fundamenty to ranking
+# na tabeli całego składu (FundamentalsTable), którą ta sama klasa przebudowuje w tle.
+
+MARKETS = ["S&P 500", "Nasdaq 100", "GPW"]
+
+class SnapshotRefresher:
+    def __init__(self, store, funds, universe, markets=MARKETS, interval=600, cache=None):
+        self.store = store
+        self.funds = funds
+        self.universe = universe
+        self.markets = list(markets)
+        self.interval = interval
+        self.cache = cache
+        self._snapshots = {}
+        self._locks = {m: threading.Lock() for m in self.markets}
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="snapshot-refresher", daemon=True)
+            self._thread.start()
+        return self
+
+    def get(self, market):
+        return self._snapshots.get(market)
+
+    def age(self, market):
+        snap = self.get(market)
+        return (datetime.now() - snap['at']).total_seconds() if snap else None
+
+    def _cached(self, key, fn, force):
+        if self.cache is None: return fn()
+        return self.cache.get(key, fn, ttl=self.interval, refresh=force)
+
+    def _fundamentals(self, market, tickers):
+        tab, meta = self.funds.table(market, tickers, seed=FUND_POOLS.get(market))
+        t0 = time.perf_counter()
+        top, best = rank(tab, DOMAINS)
+        return top, best, meta['stats'] | {"rows": len(tab), "built_at": meta['built_at'], "error": meta['error'], "rank_ms": (time.perf_counter() - t0) * 1e3}
+
+    def refresh(self, market, force=False):
+        lock = self._locks.setdefault(market, threading.Lock())
+        if not lock.acquire(blocking=False):
+            # Ten rynek właśnie się liczy - czekamy na wynik zamiast liczyć drugi raz
+            with lock: return self.get(market)
+        try:
+            t0 = time.monotonic()
+            tickers, status = self._cached(make_key("universe", market), lambda: (self.universe.tickers(market), self.universe.status(market)), force)
+            snap = {
+                "market": market, "tickers": tickers, "universe": status,
+                "overview": self._cached(make_key("overview", market, tickers), lambda: get_market_overview_fixed(tickers, market, self.store, force), force),
+                "fundamentals": self._fundamentals(market, tickers),
+                "at": datetime.now(), "took": time.monotonic() - t0, "error": None,
+            }
+            self._snapshots[market] = snap
+        except Exception as e:
+            # Zostawiamy poprzedni snapshot, tylko zapisujemy błąd
+            snap = self._snapshots.get(market)
+            if snap: snap["error"] = str(e)
+        finally:
+            lock.release()
+        return self.get(market)
+
+    def _run(self):
+        while True:
+            for m in self.markets:
+                self.refresh(m)
+            time.sleep(self.interval)
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+
+# --- HTML KART (czyste funkcje - bez Streamlit, do testów i benchmarków) ---
+
+def get_link(ticker):
+    if ".WA" in ticker: return f"https://www.biznesradar.pl/notowania/{ticker.replace('.WA', '')}"
+    return f"https://finance.yahoo.com/quote/{ticker}"
+
+def logo_div(e, logo_src=None):
+    # logo_src(ticker, domain) -> adres obrazka (assets.LogoCache.src) albo None
+    src = logo_src(e["ticker"], e.get("domain")) if logo_src else None
+    return f'<div class="logo-container"><img src="{src}" class="big-logo"></div>' if src else '<div class="logo-container" style="height:60px;"></div>'
+
+def movers_html(items, up=True):
+    html = '<div class="scroll-container">'
+    for g in items:
+        link = get_link(g["t"])
+        if up: html += f'<a href="{link}" target="_blank" class="mini-link"><div class="mini-card mini-card-up"><div class="mini-ticker">{g["t"].replace(".WA","")} 🔗</div><div class="mini-price">{g["p"]:.2f}</div><div class="mini-change text-green">+{g["mc"]:.2f}%</div></div></a>'
+        else: html += f'<a href="{link}" target="_blank" class="mini-link"><div class="mini-card mini-card-down"><div class="mini-ticker">{g["t"].replace(".WA","")} 🔗</div><div class="mini-price">{g["p"]:.2f}</div><div class="mini-change text-red">{g["mc"]:.2f}%</div></div></a>'
+    html += "</div>"
+    return html
+
+def strong_buy_html(e, croc, logo_src=None):
+    return f"""<div class="strong-buy-wrapper"><img src="{croc}" class="croc-absolute"><div class="webull-card strong-buy-card-style"><div class="badge">STRONG BUY</div><div class="card-header"><a href="{e["link"]}" target="_blank">{e["ticker"].replace(".WA","")} 🔗</a></div><table class="webull-table"><thead><tr><th>Cel Cenowy</th><th>Potencjał</th><th>Wzrost EPS</th></tr></thead><tbody><tr><td>{e["target_price"]}</td><td class="text-green">+{e["upside"]:.1f}%</td><td class="{e["g_eps_cls"]}">{e["earn_growth"]}%</td></tr></tbody></table>{logo_div(e, logo_src)}<div class="bottom-stats" style="text-align:center;">Rekomendacja: <strong>STRONG BUY</strong><br>EPS Est: {e["eps_est"]}</div></div></div>"""
+
+def fund_cards_html(top_funds, logo_src=None):
+    html = '<div class="scroll-container">'
+    for e in top_funds:
+        card = f'<div class="webull-card slider-card"><div class="card-header"><a href="{e["link"]}" target="_blank">{e["ticker"].replace(".WA","")} 🔗</a></div><table class="webull-table"><thead><tr><th>Wskaźnik</th><th>Prognoza</th><th>Wynik</th><th>Beat/Miss</th></tr></thead><tbody><tr><td>EPS</td><td>{e["eps_est"]}</td><td>{e["eps_act"]}</td><td class="{e["eps_cls"]}">{e["eps_txt"]}</td></tr><tr class="row-alt"><td>Przychód</td><td>{e["rev_est"]}</td><td>{e["rev_act"]}</td><td class="{e["rev_cls"]}">{e["rev_txt"]}</td></tr></tbody></table>{logo_div(e, logo_src)}<div class="bottom-stats"><div class="stat-row"><span>Rev r/r:</span><span class="{e["g_rev_cls"]}">{e["rev_growth"]}%</span></div><div class="stat-row"><span>EPS r/r:</span><span class="{e["g_eps_cls"]}">{e["earn_growth"]}%</span></div></div></div>'
+        html += card
+    html += "</div>"
+    return html
+
+# --- WYNIKI SKANU (tabela i jeden wykres zamiast wykresu na każde trafienie) ---
+def results_table(found):
+    return pd.DataFrame({"Spółka": [r.ticker for r in found], "Cena": [r.price for r in found], "Zmiana %": [r.change for r in found],
+                         "Sygnał": [" • ".join(d['info'] for d in r.details) for r in found],
+                         "60 sesji": [[None if x != x else float(x) for x in r.spark] for r in found]})
+
+def small_multiples(found, columns=6):
+    # Jeden wykres Altair: siatka mini-wykresów, każdy ze swoją skalą Y
+    import altair as alt
+    n = len(found[0].spark) if found else 0
+    data = pd.DataFrame({"spółka": np.repeat([r.ticker for r in found], n), "sesja": np.tile(np.arange(1 - n, 1), len(found)),
+                         "cena": np.concatenate([r.spark for r in found]) if found else []}).dropna()
+    return (alt.Chart(data).mark_line(strokeWidth=1.5)
+            .encode(x=alt.X("sesja:Q", axis=None), y=alt.Y("cena:Q", axis=None, scale=alt.Scale(zero=False)), tooltip=["spółka", "sesja", "cena"])
+            .properties(width=110, height=50)
+            .facet(facet=alt.Facet("spółka:N", title=None, sort=None), columns=columns)
+            .resolve_scale(y="independent"))
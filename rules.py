@@ -0,0 +1,153 @@
+import pandas as pd
+from indicators import align_last, wilder_rsi, sma, sma_cumsum, prefix_sums
+
+# --- REGUŁY SKANERA ---
+# Warunki łączone przez & (AND) i | (OR) liczone w jednym przebiegu po danych.
+# Wskaźniki trzymamy w IndicatorCache, więc np. SMA(20) dla reguły "cena nad SMA(20)"
+# i środek wstęg Bollingera liczy się raz, niezależnie od liczby reguł.
+
+class IndicatorCache:
+    def __init__(self, close, volume=None, aligned=False, fast=False):
+        # aligned=False: ostatni wiersz = ostatnia sesja każdej spółki (jak w skanerze);
+        # aligned=True: macierze zostają w osi dat (backtest)
+        # fast=True: SMA z sum skumulowanych (backtest) zamiast rolling() 1:1 ze skanerem
+        if not aligned: close, volume = align_last(close, volume if volume is not None else close * float('nan'))
+        self.close = close
+        self.volume = volume
+        self.fast = fast
+        self._memo = {}
+
+    def get(self, key, fn):
+        if key not in self._memo: self._memo[key] = fn()
+        return self._memo[key]
+
+    def rsi(self, period=14):
+        return self.get(("rsi", period), lambda: wilder_rsi(self.close, period))
+
+    def sma(self, n):
+        if self.fast: return self.get(("sma", n), lambda: sma_cumsum(self.close, n, self.get(("sums",), lambda: prefix_sums(self.close))))
+        return self.get(("sma", n), lambda: sma(self.close, n))
+
+    def std(self, n):
+        return self.get(("std", n), lambda: self.close.rolling(n).std())
+
+    def lower_band(self, n=20, width=2):
+        return self.get(("low", n, width), lambda: self.sma(n) - (width * self.std(n)))
+
+    def volume_avg(self, n=20):
+        return self.get(("vavg", n), lambda: self.volume.rolling(n).mean())
+
+    def bars(self):
+        return self.get(("bars",), lambda: self.close.notna().cumsum())
+
+class Rule:
+    name = ""
+
+    def mask(self, ind):
+        # DataFrame bool (daty × tickery)
+        raise NotImplementedError
+
+    def details(self, ind, ticker):
+        return None
+
+    def leaves(self):
+        return [self]
+
+    def __and__(self, other): return All(self, other)
+    def __or__(self, other): return Any(self, other)
+
+class RSIBelow(Rule):
+    def __init__(self, threshold, period=14):
+        self.threshold, self.period = threshold, period
+        self.name = f"RSI({period}) ≤ {threshold}"
+
+    def mask(self, ind):
+        return ind.rsi(self.period) <= self.threshold
+
+    def details(self, ind, ticker):
+        curr = ind.rsi(self.period)[ticker].iloc[-1]
+        return {"info": f"RSI: {round(curr, 1)} (Wyprzedanie)", "val": round(curr, 1), "name": "RSI"}
+
+class AboveSMA(Rule):
+    def __init__(self, period):
+        self.period = period
+        self.name = f"Cena > SMA({period})"
+
+    def mask(self, ind):
+        return ind.close > ind.sma(self.period)
+
+    def details(self, ind, ticker):
+        return {"info": "Cena nad SMA (Trend Wzrostowy)", "val": round(ind.sma(self.period)[ticker].iloc[-1], 2), "name": "SMA"}
+
+class NearLowerBand(Rule):
+    def __init__(self, mult=1.05, period=20, width=2):
+        self.mult, self.period, self.width = mult, period, width
+        self.name = f"Cena ≤ dolna wstęga × {mult}"
+
+    def mask(self, ind):
+        return ind.close <= ind.lower_band(self.period, self.width) * self.mult
+
+    def details(self, ind, ticker):
+        return {"info": "Przy dolnej wstędze (Tani zakup)", "val": round(ind.lower_band(self.period, self.width)[ticker].iloc[-1], 2), "name": "Low Band"}
+
+class VolumeSurge(Rule):
+    def __init__(self, mult=1.2, period=20):
+        self.mult, self.period = mult, period
+        self.name = f"Wolumen > {mult}× śr.{period}"
+
+    def mask(self, ind):
+        # Jak w dotychczasowym filtrze: brak średniej (za krótka historia) nie blokuje sygnału
+        return ~(ind.volume < ind.volume_avg(self.period) * self.mult)
+
+class MinBars(Rule):
+    def __init__(self, n=50):
+        self.n = n
+        self.name = f"Historia ≥ {n} sesji"
+
+    def mask(self, ind):
+        return ind.bars() >= self.n
+
+class All(Rule):
+    def __init__(self, *rules):
+        self.rules = [x for r in rules for x in (r.rules if isinstance(r, All) else [r])]
+        self.name = " AND ".join(f"({r.name})" if isinstance(r, Any) else r.name for r in self.rules)
+
+    def mask(self, ind):
+        out = self.rules[0].mask(ind)
+        for r in self.rules[1:]: out = out & r.mask(ind)
+        return out
+
+    def leaves(self):
+        return [x for r in self.rules for x in r.leaves()]
+
+class Any(Rule):
+    def __init__(self, *rules):
+        self.rules = [x for r in rules for x in (r.rules if isinstance(r, Any) else [r])]
+        self.name = " OR ".join(f"({r.name})" if isinstance(r, All) else r.name for r in self.rules)
+
+    def mask(self, ind):
+        out = self.rules[0].mask(ind)
+        for r in self.rules[1:]: out = out | r.mask(ind)
+        return out
+
+    def leaves(self):
+        return [x for r in self.rules for x in r.leaves()]
+
+# --- BUDOWANIE Z USTAWIEŃ SIDEBARA ---
+def build_rule(strategies, params, combine="AND"):
+    parts = []
+    for s in strategies:
+        if s == "RSI": parts.append(RSIBelow(params['rsi_threshold']))
+        elif s == "SMA": parts.append(AboveSMA(params['sma_period']))
+        elif s == "Bollinger": parts.append(NearLowerBand(params.get('bb_mult', 1.05)))
+    if not parts: return None
+    rule = parts[0] if len(parts) == 1 else (All(*parts) if combine == "AND" else Any(*parts))
+    if params.get('use_vol', False): rule = rule & VolumeSurge()
+    return rule & MinBars(50)
+
+def match_matrix(ind, rule):
+    # Ostatnia sesja: tickery × warunki (+ kolumna 'match' dla całej reguły)
+    leaves = rule.leaves()
+    out = pd.DataFrame({r.name: r.mask(ind).iloc[-1] for r in leaves})
+    out["match"] = rule.mask(ind).iloc[-1]
+    return out
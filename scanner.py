@@ -0,0 +1,122 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+from providers import yf_download
+from indicators import panel_matrices
+from rules import IndicatorCache, match_matrix
+
+# --- SKANER TECHNICZNY (BATCH) ---
+# Zamiast jednego yf.download na spółkę pobieramy cały rynek paczkami po chunk_size
+# tickerów (group_by='ticker'), a nieudane paczki / tickery ponawiamy.
+
+# --- WYNIK SKANU ---
+# Zamiast kopii całego roku notowań (DataFrame na trafienie) trzymamy tylko pola
+# sygnału i ostatnie SPARK_LEN zamknięć jako float32 - tyle, ile pokazuje wykres.
+SPARK_LEN = 60
+
+class ScanResult:
+    __slots__ = ("ticker", "price", "change", "details", "signals", "spark")
+
+    def __init__(self, ticker, price, change, details, signals, spark):
+        self.ticker = ticker
+        self.price = price
+        self.change = change
+        self.details = details      # [{info, val, name}] dla spełnionych warunków
+        self.signals = signals      # nazwy spełnionych warunków reguły
+        self.spark = spark          # np.float32[SPARK_LEN], NaN na początku przy krótkiej historii
+
+    def __repr__(self):
+        return f"ScanResult({self.ticker}, {self.price}, {self.change}%)"
+
+def split_panel(data, tickers):
+    frames = {}
+    if data is None or data.empty: return frames
+    if isinstance(data.columns, pd.MultiIndex):
+        available = set(data.columns.get_level_values(0))
+        for t in tickers:
+            if t in available: frames[t] = data[t]
+    elif len(tickers) == 1:
+        frames[tickers[0]] = data
+    for t in list(frames):
+        df = frames[t].dropna(subset=['Close'])
+        if df.empty: del frames[t]
+        else: frames[t] = df
+    return frames
+
+def fetch_panel(tickers, period="1y", start=None, chunk_size=100, retries=2, source=None, progress=None, retry_wait=1.0):
+    source = source or yf_download
+    pending = list(dict.fromkeys(tickers))
+    total = len(pending)
+    frames = {}
+    for attempt in range(retries + 1):
+        failed = []
+        for i in range(0, len(pending), chunk_size):
+            chunk = pending[i:i + chunk_size]
+            try:
+                got = split_panel(source(chunk, period=period, start=start), chunk)
+            except Exception:
+                got = {}
+            frames.update(got)
+            failed += [t for t in chunk if t not in got]
+            if progress and attempt == 0: progress(min(i + chunk_size, total), total)
+        pending = failed
+        if not pending: break
+        if attempt < retries and retry_wait: time.sleep(retry_wait * (attempt + 1))
+    return frames, pending
+
+def scan_frames(frames, tickers, rule):
+    # Jeden przebieg po danych dla dowolnej kombinacji warunków z rules.py
+    frames = {t: frames[t] for t in tickers if t in frames}
+    if not frames: return []
+    close, volume = panel_matrices(frames)
+    if len(close) < 2: return []
+    ind = IndicatorCache(close, volume)
+    matrix = match_matrix(ind, rule)
+    last, prev = ind.close.iloc[-1], ind.close.iloc[-2]
+    matched = matrix.index[matrix['match']]
+    # ind.close jest wyrównane do prawej, więc ostatnie wiersze = ostatnie sesje każdej spółki
+    sparks = np.ascontiguousarray(ind.close[matched].iloc[-SPARK_LEN:].to_numpy(np.float32).T)
+    if sparks.shape[1] < SPARK_LEN: sparks = np.pad(sparks, ((0, 0), (SPARK_LEN - sparks.shape[1], 0)), constant_values=np.nan)
+    found = []
+    for i, t in enumerate(matched):
+        details = [d for r in rule.leaves() if matrix.at[t, r.name] for d in [r.details(ind, t)] if d]
+        signals = tuple(r.name for r in rule.leaves() if matrix.at[t, r.name])
+        found.append(ScanResult(t, round(last[t], 2), round(((last[t]-prev[t])/prev[t])*100, 2), details, signals, sparks[i]))
+    return found
+
+# --- SKAN STRUMIENIOWY ---
+# Generator oddaje wyniki paczka po paczce, więc UI pokazuje trafienia od razu.
+# Pierwsza paczka jest mała (szybki pierwszy wynik), kolejna pobiera się w tle,
+# gdy bieżąca jest analizowana. Przerwanie = zamknięcie generatora lub cancel().
+
+def chunk_plan(tickers, chunk_size=100, first_chunk=20):
+    chunks, i, size = [], 0, min(first_chunk, chunk_size)
+    while i < len(tickers):
+        chunks.append(tickers[i:i + size])
+        i += size
+        size = min(size * 2, chunk_size)
+    return chunks
+
+def iter_scan(tickers, rule, fetch=None, chunk_size=100, first_chunk=20, cancel=None):
+    # fetch(chunk) -> (frames, failed); domyślnie wprost z dostawcy
+    fetch = fetch or (lambda chunk: fetch_panel(chunk, chunk_size=chunk_size))
+    tickers = list(dict.fromkeys(tickers))
+    chunks = chunk_plan(tickers, chunk_size, first_chunk)
+    t0 = time.monotonic()
+    done = 0
+    pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="scan-prefetch")
+    try:
+        nxt = pool.submit(fetch, chunks[0]) if chunks else None
+        for i, chunk in enumerate(chunks):
+            frames, failed = nxt.result()
+            nxt = pool.submit(fetch, chunks[i + 1]) if i + 1 < len(chunks) and not (cancel and cancel()) else None
+            found = scan_frames(frames, chunk, rule)
+            done += len(chunk)
+            elapsed = time.monotonic() - t0
+            rate = done / elapsed if elapsed else 0.0
+            yield {"found": found, "failed": failed, "done": done, "total": len(tickers), "elapsed": elapsed, "rate": rate, "eta": (len(tickers) - done) / rate if rate else None}
+            if nxt is None: break
+    finally:
+        # Przy przerwaniu nie czekamy na pobieraną w tle paczkę
+        pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,177 @@
+import os
+import time
+import uuid
+import pickle
+import sqlite3
+import hashlib
+import threading
+
+# --- WSPÓLNY CACHE (SQLite na dysku, dzielony przez procesy i repliki) ---
+# st.cache_data żyje w jednym procesie, więc każda replika liczyła przegląd rynku,
+# fundamenty i skład indeksu od nowa. Tu wpisy leżą w jednym pliku SQLite (WAL):
+# - TTL na wpis i limit rozmiaru (usuwamy najdawniej używane),
+# - równoczesne chybienia dla tego samego klucza łączymy: w procesie przez Event,
+#   między procesami przez dzierżawę (wiersz w tabeli leases) - liczy tylko jeden,
+#   pozostali czekają na jego wynik,
+# - liczniki trafień / chybień / połączonych żądań (lokalne i wspólne w pliku).
+
+COUNTERS = ("hits", "misses", "coalesced", "evictions", "errors")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL,
+                                    expires REAL NOT NULL, written REAL NOT NULL, accessed REAL NOT NULL);
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries(accessed);
+CREATE TABLE IF NOT EXISTS leases (key TEXT PRIMARY KEY, owner TEXT NOT NULL, expires REAL NOT NULL);
+CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL);
+"""
+
+def make_key(name, *parts):
+    # Listy tickerów potrafią mieć tysiące pozycji - w kluczu tylko ich skrót
+    digest = hashlib.sha1(repr(parts).encode()).hexdigest()[:16] if parts else ""
+    return f"{name}:{digest}"
+
+class SharedCache:
+    def __init__(self, path="data/cache.sqlite", max_bytes=256 * 2**20, ttl=600, lease=120, poll=0.05):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.lease = lease      # po tylu sekundach dzierżawa martwego procesu przestaje blokować
+        self.poll = poll
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self._local = threading.local()
+        self._inflight = {}     # key -> Event (żądania w toku w tym procesie)
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db().executescript(SCHEMA)
+
+    def _db(self):
+        # Połączenie na wątek (sqlite3 nie dzieli połączeń między wątkami)
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
+
+    def _count(self, name, n=1):
+        if not n: return
+        with self._lock: self.counters[name] += n
+        self._db().execute("INSERT INTO counters VALUES (?, ?) ON CONFLICT(name) DO UPDATE SET value = value + excluded.value", (name, n))
+
+    # --- ODCZYT / ZAPIS ---
+    def _read(self, key, since=None):
+        db, now = self._db(), time.time()
+        row = db.execute("SELECT value, expires, written FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None or row[1] <= now or (since is not None and row[2] < since): return False, None
+        db.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+        return True, pickle.loads(row[0])
+
+    def _acquire(self, key, since):
+        # Jedna transakcja: albo ktoś już zapisał wynik, albo ktoś liczy, albo dzierżawa jest nasza
+        db, now = self._db(), time.time()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            row = db.execute("SELECT value, expires, written FROM entries WHERE key = ?", (key,)).fetchone()
+            if row and row[1] > now and (since is None or row[2] >= since):
+                db.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+                db.execute("COMMIT")
+                return "hit", pickle.loads(row[0])
+            lease = db.execute("SELECT owner, expires FROM leases WHERE key = ?", (key,)).fetchone()
+            if lease and lease[0] != self.owner and lease[1] > now:
+                db.execute("COMMIT")
+                return "wait", None
+            db.execute("INSERT OR REPLACE INTO leases VALUES (?, ?, ?)", (key, self.owner, now + self.lease))
+            db.execute("COMMIT")
+            return "lease", None
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+
+    def _store(self, key, value, ttl):
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        db, now = self._db(), time.time()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            db.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)", (key, blob, len(blob), now + ttl, now, now))
+            db.execute("DELETE FROM leases WHERE key = ? AND owner = ?", (key, self.owner))
+            evicted = self._evict(db, now, keep=key)
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        self._count("evictions", evicted)
+
+    def _evict(self, db, now, keep=None):
+        db.execute("DELETE FROM entries WHERE expires <= ?", (now,))
+        total = db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        evicted = 0
+        if total > self.max_bytes:
+            for key, size in db.execute("SELECT key, size FROM entries WHERE key != ? ORDER BY accessed", (keep,)).fetchall():
+                db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                total -= size; evicted += 1
+                if total <= self.max_bytes: break
+        return evicted
+
+    # --- API ---
+    def get(self, key, fn, ttl=None, refresh=False):
+        # refresh=True: pomijamy zapisany wpis, ale równoległe odświeżenia nadal liczą się raz
+        ttl = self.ttl if ttl is None else ttl
+        since = time.time() if refresh else None
+        if not refresh:
+            hit, value = self._read(key)
+            if hit:
+                self._count("hits")
+                return value
+        with self._lock:
+            ev = self._inflight.get(key)
+            leader = ev is None
+            if leader: ev = self._inflight[key] = threading.Event()
+        if not leader:
+            ev.wait(self.lease)
+            hit, value = self._read(key, since)
+            if hit:
+                self._count("coalesced")
+                return value
+            return self.get(key, fn, ttl, refresh)  # lider się nie powiódł - próbujemy sami
+        try:
+            return self._compute(key, fn, ttl, since)
+        finally:
+            with self._lock: self._inflight.pop(key, None)
+            ev.set()
+
+    def _compute(self, key, fn, ttl, since):
+        waited = False
+        while True:
+            state, value = self._acquire(key, since)
+            if state == "hit":
+                self._count("coalesced" if waited or since is not None else "hits")
+                return value
+            if state == "lease": break
+            waited = True
+            time.sleep(self.poll)
+        self._count("misses")
+        try:
+            value = fn()
+        except BaseException:
+            self._db().execute("DELETE FROM leases WHERE key = ? AND owner = ?", (key, self.owner))
+            self._count("errors")
+            raise
+        self._store(key, value, ttl)
+        return value
+
+    def invalidate(self, key):
+        self._db().execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def stats(self):
+        # Liczniki tego procesu + stan pliku
+        db = self._db()
+        entries, size = db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        with self._lock: out = dict(self.counters)
+        return out | {"entries": entries, "bytes": size}
+
+    def shared_stats(self):
+        # Liczniki zsumowane po wszystkich procesach korzystających z pliku
+        rows = dict(self._db().execute("SELECT name, value FROM counters").fetchall())
+        return {name: rows.get(name, 0) for name in COUNTERS}
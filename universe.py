@@ -0,0 +1,179 @@
+import os
+import glob
+import json
+import threading
+from io import StringIO
+from datetime import datetime
+import requests
+import pandas as pd
+from markets import POOL_SP500, POOL_GPW, BACKUP_NASDAQ
+
+# --- SKŁAD INDEKSÓW (UNIVERSE) ---
+# Wersjonowane snapshoty składu indeksów na dysku (<root>/<rynek>/v<czas>.json).
+# Strona zawsze dostaje ostatni snapshot od ręki; gdy jest przeterminowany, odświeżamy
+# go w tle zapytaniem warunkowym (ETag / Last-Modified), więc przy braku zmian nie
+# ściągamy ani nie parsujemy HTML-a. Awaryjne listy z markets.py są jawnie oznaczone.
+
+HEADERS = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"}
+SP500_CSV = "https://raw.githubusercontent.com/datasets/s-and-p-500-companies/master/data/constituents.csv"
+SP500_WIKI = "https://en.wikipedia.org/wiki/List_of_S%26P_500_companies"
+NASDAQ_WIKI = "https://en.wikipedia.org/wiki/Nasdaq-100"
+
+def normalize_symbol(symbol, market=None):
+    s = str(symbol).strip().upper()
+    if market == "GPW":
+        return s if s.endswith(".WA") else f"{s}.WA"
+    return s.replace('.', '-')
+
+def _parse_sp500_csv(text):
+    return pd.read_csv(StringIO(text))['Symbol'].tolist()
+
+def _parse_sp500_wiki(text):
+    return pd.read_html(StringIO(text))[0]['Symbol'].tolist()
+
+def _parse_nasdaq_wiki(text):
+    for t in pd.read_html(StringIO(text)):
+        if 'Ticker' in t.columns: return t['Ticker'].tolist()
+    raise ValueError("Brak tabeli z kolumną 'Ticker'")
+
+# Źródła w kolejności prób
+SOURCES = {
+    "S&P 500": [("github-csv", SP500_CSV, _parse_sp500_csv), ("wikipedia", SP500_WIKI, _parse_sp500_wiki)],
+    "Nasdaq 100": [("wikipedia", NASDAQ_WIKI, _parse_nasdaq_wiki)],
+}
+STATIC = {"GPW": POOL_GPW}  # GPW nie ma źródła online - skład to lista z markets.py
+FALLBACK = {"S&P 500": POOL_SP500, "Nasdaq 100": BACKUP_NASDAQ}
+
+class UniverseService:
+    def __init__(self, root="data/universe", ttl=3600*24, retry=300, keep_versions=5, min_ratio=0.8, timeout=15, http_get=None):
+        self.root = root
+        self.ttl = ttl                  # po ilu sekundach sprawdzamy, czy skład się zmienił
+        self.retry = retry              # co ile ponawiać, gdy działamy na liście awaryjnej
+        self.keep_versions = keep_versions
+        self.min_ratio = min_ratio      # nowa lista krótsza niż 80% poprzedniej = błąd źródła
+        self.timeout = timeout
+        self.http_get = http_get or requests.get  # podmieniane w benchmarkach
+        self._snap = {}     # market -> snapshot (dict)
+        self._members = {}  # market -> {alias: symbol} do wyszukiwania w O(1)
+        self._lock = threading.Lock()
+        self._refreshing = set()
+
+    # --- DYSK ---
+    def _dir(self, market):
+        return os.path.join(self.root, market.replace(" ", "_").replace("&", "and"))
+
+    def _load_latest(self, market):
+        versions = sorted(glob.glob(os.path.join(self._dir(market), "v*.json")))
+        if not versions: return None
+        with open(versions[-1], encoding="utf-8") as f: return json.load(f)
+
+    def _save(self, market, snap):
+        os.makedirs(self._dir(market), exist_ok=True)
+        path = os.path.join(self._dir(market), f"v{snap['version']}.json")
+        with open(path + ".tmp", "w", encoding="utf-8") as f: json.dump(snap, f)
+        os.replace(path + ".tmp", path)
+        for old in sorted(glob.glob(os.path.join(self._dir(market), "v*.json")))[:-self.keep_versions]:
+            os.remove(old)
+
+    def _activate(self, market, snap):
+        members = {}
+        for s in snap['tickers']:
+            members[s] = s
+            members[s.replace('-', '.')] = s
+            if s.endswith(".WA"): members[s[:-3]] = s
+        self._snap[market], self._members[market] = snap, members
+
+    # --- API ---
+    def tickers(self, market):
+        snap = self._get(market)
+        if self._due(snap): self.refresh_async(market)
+        return snap['tickers']
+
+    def contains(self, market, symbol):
+        self._get(market)
+        return str(symbol).strip().upper() in self._members[market]
+
+    def lookup(self, market, symbol):
+        # 'brk.b' -> 'BRK-B', 'pkn' -> 'PKN.WA'; None gdy spółki nie ma w indeksie
+        self._get(market)
+        return self._members[market].get(str(symbol).strip().upper())
+
+    def status(self, market):
+        snap = self._get(market)
+        return {k: snap.get(k) for k in ("source", "version", "fetched_at", "checked_at", "fallback")} | {"count": len(snap['tickers']), "error": snap.get("error")}
+
+    def _get(self, market):
+        snap = self._snap.get(market)
+        if snap is None:
+            with self._lock:
+                snap = self._snap.get(market)
+                if snap is None:
+                    snap = self._static(market) if market in STATIC else self._load_latest(market)
+                    if snap is None:
+                        # Zimny start bez snapshotu na dysku: jedna synchroniczna próba
+                        snap, error = self._fetch(market, None)
+                        if snap: self._save(market, snap)
+                        else: snap = self._fallback(market, error)
+                    self._activate(market, snap)
+        return snap
+
+    def _static(self, market):
+        now = datetime.now().isoformat(timespec="seconds")
+        return {"market": market, "source": "markets.py", "version": "wbudowana", "fetched_at": now, "checked_at": now,
+                "fallback": False, "static": True, "error": None, "tickers": [normalize_symbol(t, market) for t in STATIC[market]]}
+
+    def _fallback(self, market, error):
+        now = datetime.now().isoformat(timespec="seconds")
+        return {"market": market, "source": "lista awaryjna", "version": "fallback", "fetched_at": now, "checked_at": now,
+                "fallback": True, "error": error, "tickers": [normalize_symbol(t, market) for t in FALLBACK.get(market, [])]}
+
+    def _due(self, snap):
+        if snap.get('static'): return False
+        age = (datetime.now() - datetime.fromisoformat(snap['checked_at'])).total_seconds()
+        return age > (self.retry if snap.get('fallback') else self.ttl)
+
+    # --- ODŚWIEŻANIE ---
+    def _fetch(self, market, prev):
+        errors = []
+        now = datetime.now()
+        for name, url, parse in SOURCES.get(market, []):
+            headers = dict(HEADERS)
+            if prev and prev.get('source') == name:
+                if prev.get('etag'): headers["If-None-Match"] = prev['etag']
+                if prev.get('last_modified'): headers["If-Modified-Since"] = prev['last_modified']
+            try:
+                r = self.http_get(url, headers=headers, timeout=self.timeout)
+                if r.status_code == 304:
+                    return dict(prev, checked_at=now.isoformat(timespec="seconds"), error=None), None
+                r.raise_for_status()
+                tickers = list(dict.fromkeys(normalize_symbol(t, market) for t in parse(r.text)))
+                if prev and not prev.get('fallback') and len(tickers) < len(prev['tickers']) * self.min_ratio:
+                    raise ValueError(f"{name}: tylko {len(tickers)} spółek (poprzednio {len(prev['tickers'])})")
+                return {"market": market, "source": name, "url": url, "version": now.strftime("%Y%m%d%H%M%S"),
+                        "fetched_at": now.isoformat(timespec="seconds"), "checked_at": now.isoformat(timespec="seconds"),
+                        "etag": r.headers.get("ETag"), "last_modified": r.headers.get("Last-Modified"),
+                        "fallback": False, "error": None, "tickers": tickers}, None
+            except Exception as e:
+                errors.append(f"{name}: {e}")
+        return None, "; ".join(errors)
+
+    def refresh(self, market):
+        prev = self._get(market)
+        if prev.get('static'): return prev
+        snap, error = self._fetch(market, prev)
+        if snap is None:
+            # Źródło niedostępne: zostaje poprzedni snapshot, ale przesuwamy termin kolejnej próby
+            prev.update(checked_at=datetime.now().isoformat(timespec="seconds"), error=error)
+            return prev
+        self._save(market, snap)  # przy 304 nadpisuje tę samą wersję nowym checked_at
+        with self._lock: self._activate(market, snap)
+        return snap
+
+    def refresh_async(self, market):
+        with self._lock:
+            if market in self._refreshing: return
+            self._refreshing.add(market)
+        def run():
+            try: self.refresh(market)
+            finally: self._refreshing.discard(market)
+        threading.Thread(target=run, name=f"universe-{market}", daemon=True).start()